@@ -0,0 +1,15 @@
+-- macros/dq_mode.sql
+-- Data-quality mode switch for the custom tests.
+--   batch (default) : tests only look at the latest _loaded_at batch + the dq_review_stats table
+--   deep            : full-table verification, for a scheduled run:
+--                     dbt build --profiles-dir . --vars '{dq_mode: deep}'
+-- The custom tests are tagged dq_batch; the micro-batch daemon runs only those
+-- (dbt test --select tag:dq_batch), not the full-table generic tests.
+
+{% macro dq_deep_check() %}
+    {{ return(var('dq_mode', 'batch') == 'deep') }}
+{% endmacro %}
+
+{% macro latest_batch_loaded_at() %}
+    (select max(batch_loaded_at) from {{ ref('dq_review_stats') }})
+{% endmacro %}
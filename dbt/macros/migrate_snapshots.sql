@@ -0,0 +1,48 @@
+-- macros/migrate_snapshots.sql
+-- Runs on every dbt invocation (on-run-start in dbt_project.yml).
+-- snapshots.scd2_developers used to be keyed on developer_name and has no app_id column;
+-- dbt snapshot cannot merge the app_id-keyed input into it. Such a table is renamed to
+-- scd2_developers_legacy (history kept for reference) so the snapshot starts over from a
+-- full input of the newest catalog load.
+--
+-- dim_developers.developer_key used to be md5(developer_name); it now identifies one
+-- app × version row. fact_reviews is incremental, so rows built before the change keep
+-- the old keys and would point at nothing (or at several versions). If any fact row
+-- still carries an old-style key, fact_reviews is dropped and rebuilt in full by this run
+-- (_loaded_at is carried over from stg_reviews, so downstream incrementals see no new rows).
+-- Only invocations that build fact_reviews do this; `dbt test` / `dbt snapshot` leave it alone.
+
+{% macro migrate_scd2_developers() %}
+    {% if execute %}
+        {% set relation = adapter.get_relation(database=target.database, schema='snapshots', identifier='scd2_developers') %}
+        {% if relation %}
+            {% set columns = adapter.get_columns_in_relation(relation) | map(attribute='name') | map('lower') | list %}
+            {% if 'app_id' not in columns %}
+                {% do log('Renaming legacy snapshots.scd2_developers (no app_id) to scd2_developers_legacy', info=True) %}
+                {% set legacy = relation.incorporate(path={'identifier': 'scd2_developers_legacy'}) %}
+                {% do adapter.drop_relation(legacy) %}
+                {% do adapter.rename_relation(relation, legacy) %}
+                {% do adapter.commit() %}
+            {% endif %}
+        {% endif %}
+    {% endif %}
+{% endmacro %}
+
+
+{% macro migrate_developer_keys() %}
+    {% if execute and ('model.' ~ project_name ~ '.fact_reviews') in selected_resources %}
+        {% set facts = adapter.get_relation(database=target.database, schema=target.schema, identifier='fact_reviews') %}
+        {% set devs = adapter.get_relation(database=target.database, schema=target.schema, identifier='dim_developers') %}
+        {% if facts and devs %}
+            {% set stale = run_query(
+                "select count(*) from " ~ facts ~ " f where exists (select 1 from " ~ devs ~
+                " d where f.developer_key = md5(d.developer_name))"
+            ).columns[0].values()[0] %}
+            {% if stale %}
+                {% do log('Dropping fact_reviews: ' ~ stale ~ ' rows carry md5(developer_name) keys, rebuilding', info=True) %}
+                {% do adapter.drop_relation(facts) %}
+                {% do adapter.commit() %}
+            {% endif %}
+        {% endif %}
+    {% endif %}
+{% endmacro %}
@@ -0,0 +1,53 @@
+-- models/marts/agg_app_daily.sql
+-- Pre-aggregated mart: one row per app × day.
+-- Holds additive measures only, so any KPI (avg rating, % low ratings...) can be
+-- derived from this small table instead of re-scanning fact_reviews.
+--
+-- INCREMENTAL LOADING:
+--   First run  : aggregates the whole fact table
+--   Later runs : finds the (app_key, date_key) pairs touched by fact rows with
+--                _loaded_at > MAX(_loaded_at) already aggregated, and recomputes only those.
+--
+-- unique_key=(app_key, date_key) + delete+insert = idempotent:
+--   a touched day is replaced by its full recomputation, never double-counted.
+
+{{
+    config(
+        materialized='incremental',
+        unique_key=['app_key', 'date_key'],
+        on_schema_change='sync_all_columns',
+        incremental_strategy='delete+insert'
+    )
+}}
+
+with facts as (
+    select * from {{ ref('fact_reviews') }}
+),
+
+{% if is_incremental() %}
+-- Only the app × day cells that received rows since the last run
+touched as (
+    select distinct app_key, date_key
+    from facts
+    where _loaded_at > (select coalesce(max(_loaded_at), '') from {{ this }})
+),
+{% endif %}
+
+scoped as (
+    select f.*
+    from facts f
+    {% if is_incremental() %}
+    inner join touched t on f.app_key = t.app_key and f.date_key = t.date_key
+    {% endif %}
+)
+
+select
+    app_key,
+    date_key,
+    count(*)                                        as review_count,
+    sum(rating)                                     as rating_sum,
+    sum(case when rating <= 2 then 1 else 0 end)    as low_rating_count,
+    sum(thumbs_up_count)                            as thumbs_up_sum,
+    max(_loaded_at)                                 as _loaded_at
+from scoped
+group by app_key, date_key
@@ -0,0 +1,46 @@
+-- models/marts/agg_app_kpis.sql
+-- App-level KPIs derived from agg_app_daily (same metrics as app_level_kpis.csv).
+-- Materialized as a VIEW: the heavy lifting is already done by the incremental aggregate.
+
+{{ config(materialized='view') }}
+
+with daily as (
+    select * from {{ ref('agg_app_daily') }}
+),
+
+apps as (
+    select app_key, app_id, app_name
+    from {{ ref('dim_apps') }}
+),
+
+dates as (
+    select date_key, date
+    from {{ ref('dim_date') }}
+),
+
+per_app as (
+    select
+        d.app_key,
+        sum(d.review_count)                             as num_reviews,
+        sum(d.rating_sum)                               as rating_sum,
+        sum(d.low_rating_count)                         as low_rating_count,
+        sum(d.thumbs_up_sum)                            as thumbs_up_sum,
+        min(dt.date)                                    as first_review_date,
+        max(dt.date)                                    as last_review_date
+    from daily d
+    inner join dates dt on d.date_key = dt.date_key
+    group by d.app_key
+)
+
+select
+    a.app_key,
+    a.app_id,
+    a.app_name                                                  as title,
+    p.num_reviews,
+    round(p.rating_sum * 1.0 / p.num_reviews, 2)                as avg_rating,
+    round(p.low_rating_count * 100.0 / p.num_reviews, 2)        as pct_low_ratings,
+    p.thumbs_up_sum,
+    p.first_review_date,
+    p.last_review_date
+from per_app p
+inner join apps a on p.app_key = a.app_key
@@ -0,0 +1,24 @@
+-- models/marts/agg_daily_metrics.sql
+-- Market-wide daily time series derived from agg_app_daily (same metrics as daily_metrics.csv).
+
+{{ config(materialized='view') }}
+
+with daily as (
+    select * from {{ ref('agg_app_daily') }}
+),
+
+dates as (
+    select date_key, date
+    from {{ ref('dim_date') }}
+)
+
+select
+    dt.date,
+    d.date_key,
+    sum(d.review_count)                                         as daily_review_count,
+    round(sum(d.rating_sum) * 1.0 / sum(d.review_count), 2)     as daily_avg_rating,
+    sum(d.low_rating_count)                                     as daily_low_rating_count
+from daily d
+inner join dates dt on d.date_key = dt.date_key
+group by dt.date, d.date_key
+order by dt.date
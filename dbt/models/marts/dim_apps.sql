@@ -12,8 +12,8 @@ categories as (
 ),
 
 devs as (
-    -- Only current developer records for the FK
-    select developer_key, developer_name
+    -- Only current developer records for the FK (one per app)
+    select developer_key, app_id
     from {{ ref('dim_developers') }}
     where is_current = true
 )
@@ -33,4 +33,4 @@ select
 
 from apps a
 left join categories c on a.category_name = c.category_name
-left join devs       d on a.developer_name = d.developer_name
\ No newline at end of file
+left join devs       d on a.app_id = d.app_id
\ No newline at end of file
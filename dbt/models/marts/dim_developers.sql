@@ -1,15 +1,19 @@
 -- models/marts/dim_developers.sql
 -- Reads from the SCD2 snapshot to expose current + historical developer records.
+-- One row per app × developer version (the snapshot is keyed on app_id).
 -- is_current = true → the version valid right now.
--- is_current = false → a historical version (developer was renamed/changed).
+-- is_current = false → a historical version (the app's developer was renamed/changed).
+-- developer_key identifies one version row (app × name × valid_from): the same name can
+-- appear under several apps and versions, so md5(developer_name) alone is not unique.
 
 {{ config(materialized='table') }}
 
 select
-    md5(developer_name)                             as developer_key,
+    md5(app_id || '|' || developer_name || '|' || cast(dbt_valid_from as varchar)) as developer_key,
     developer_name,
+    app_id,
     dbt_valid_from                                  as valid_from,
     coalesce(dbt_valid_to, '9999-12-31'::timestamp) as valid_to,
     case when dbt_valid_to is null then true
          else false end                             as is_current
-from {{ ref('scd2_developers') }}
\ No newline at end of file
+from {{ ref('scd2_developers') }}
@@ -0,0 +1,63 @@
+-- models/marts/dim_review_content.sql
+-- Text store: one row per DISTINCT review body, keyed by content hash.
+-- Many reviews are short identical strings ("Great app", "Good", ""), so storing each
+-- body once shrinks the text column considerably.
+--
+-- Rows are inserted sorted by review_text: similar strings land next to each other
+-- in the same row groups, which helps DuckDB's dictionary/FSST string compression.
+--
+-- INCREMENTAL LOADING: only bodies from fact rows newer than the last run whose
+-- hash is not already stored (anti-join). Bodies are immutable → append.
+-- The _loaded_at filter is applied to BOTH sides of the join: a fact row carries its
+-- staging row's _loaded_at, so only the batch's review_text is read from stg_reviews.
+
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='append',
+        on_schema_change='sync_all_columns'
+    )
+}}
+
+with staged as (
+    select review_id, review_text
+    from {{ ref('stg_reviews') }}
+
+    {% if is_incremental() %}
+    where _loaded_at > (select coalesce(max(_loaded_at), '') from {{ this }})
+    {% endif %}
+),
+
+new_reviews as (
+    select s.review_text, f._loaded_at
+    from staged s
+    inner join {{ ref('fact_reviews') }} f on s.review_id = f.review_id
+
+    {% if is_incremental() %}
+    where f._loaded_at > (select coalesce(max(_loaded_at), '') from {{ this }})
+    {% endif %}
+),
+
+hashed as (
+    select
+        md5(review_text)        as content_hash,
+        review_text,
+        min(_loaded_at)         as _loaded_at
+    from new_reviews
+    group by review_text
+)
+
+select
+    h.content_hash,
+    h.review_text,
+    length(h.review_text)       as text_length,
+    h._loaded_at
+from hashed h
+
+-- ANTI-JOIN: a body seen in an earlier batch is already stored
+{% if is_incremental() %}
+left join {{ this }} existing on h.content_hash = existing.content_hash
+where existing.content_hash is null
+{% endif %}
+
+order by h.review_text
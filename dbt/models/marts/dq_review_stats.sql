@@ -0,0 +1,74 @@
+-- models/marts/dq_review_stats.sql
+-- One row per load batch (_loaded_at) with row counts and RUNNING totals.
+-- Lets the data-quality tests check a new batch without re-counting the full tables.
+--
+-- stg_reviews is deduplicated across batches (anti-join), so counting a batch's rows
+-- there is already a distinct count; the running total is the all-time distinct count.
+--
+-- INCREMENTAL LOADING: only batches newer than the last one recorded; running totals
+-- continue from the previous maximum.
+
+{{
+    config(
+        materialized='incremental',
+        unique_key='batch_loaded_at',
+        on_schema_change='sync_all_columns',
+        incremental_strategy='delete+insert'
+    )
+}}
+
+with staged as (
+    select
+        _loaded_at                  as batch_loaded_at,
+        any_value(_source_file)     as source_file,
+        count(*)                    as staged_reviews
+    from {{ ref('stg_reviews') }}
+    {% if is_incremental() %}
+    where _loaded_at > (select coalesce(max(batch_loaded_at), '') from {{ this }})
+    {% endif %}
+    group by _loaded_at
+),
+
+facts as (
+    select
+        _loaded_at                  as batch_loaded_at,
+        count(*)                    as fact_reviews
+    from {{ ref('fact_reviews') }}
+    {% if is_incremental() %}
+    where _loaded_at > (select coalesce(max(batch_loaded_at), '') from {{ this }})
+    {% endif %}
+    group by _loaded_at
+),
+
+{% if is_incremental() %}
+previous as (
+    select
+        coalesce(max(cumulative_staged_reviews), 0)  as staged_total,
+        coalesce(max(cumulative_fact_reviews), 0)    as fact_total
+    from {{ this }}
+),
+{% else %}
+previous as (
+    select 0 as staged_total, 0 as fact_total
+),
+{% endif %}
+
+batches as (
+    select
+        s.batch_loaded_at,
+        s.source_file,
+        s.staged_reviews,
+        coalesce(f.fact_reviews, 0)  as fact_reviews
+    from staged s
+    left join facts f on s.batch_loaded_at = f.batch_loaded_at
+)
+
+select
+    b.batch_loaded_at,
+    b.source_file,
+    b.staged_reviews,
+    b.fact_reviews,
+    p.staged_total + sum(b.staged_reviews) over (order by b.batch_loaded_at)  as cumulative_staged_reviews,
+    p.fact_total   + sum(b.fact_reviews)   over (order by b.batch_loaded_at)  as cumulative_fact_reviews
+from batches b
+cross join previous p
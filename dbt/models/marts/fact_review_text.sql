@@ -0,0 +1,40 @@
+-- models/marts/fact_review_text.sql
+-- Narrow bridge from fact_reviews to the deduplicated text store:
+-- one row per review → content_hash (FK to dim_review_content) + user_name.
+-- Sorted by content_hash so repeated hashes compress well.
+--
+-- INCREMENTAL LOADING: same filter as fact_reviews — only rows whose fact row
+-- was loaded after the last run, applied to stg_reviews too so only the batch's
+-- text is read. unique_key='review_id' keeps it idempotent.
+
+{{
+    config(
+        materialized='incremental',
+        unique_key='review_id',
+        on_schema_change='sync_all_columns',
+        incremental_strategy='delete+insert'
+    )
+}}
+
+with staged as (
+    select review_id, review_text, user_name
+    from {{ ref('stg_reviews') }}
+
+    {% if is_incremental() %}
+    where _loaded_at > (select coalesce(max(_loaded_at), '') from {{ this }})
+    {% endif %}
+)
+
+select
+    s.review_id,
+    md5(s.review_text)          as content_hash,
+    s.user_name,
+    f._loaded_at
+from staged s
+inner join {{ ref('fact_reviews') }} f on s.review_id = f.review_id
+
+{% if is_incremental() %}
+where f._loaded_at > (select coalesce(max(_loaded_at), '') from {{ this }})
+{% endif %}
+
+order by content_hash
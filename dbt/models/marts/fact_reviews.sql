@@ -1,5 +1,7 @@
 -- models/marts/fact_reviews.sql
--- Central fact table: one row per review.
+-- Central fact table: one row per review — keys and measures only.
+-- Free text (review_text, user_name) lives in fact_review_text / dim_review_content,
+-- so aggregate scans and delete+insert merges don't drag bulky strings along.
 --
 -- INCREMENTAL LOADING:
 --   First run  : full load (the if is_incremental block is skipped)
@@ -49,10 +51,6 @@ joined as (
         r.rating,
         r.thumbs_up_count,
 
-        -- Degenerate dims (no join needed for common queries)
-        r.review_text,
-        r.user_name,
-
         -- Audit
         r._loaded_at,
         r._source_file
@@ -76,8 +74,6 @@ select
     date_key,
     rating,
     thumbs_up_count,
-    review_text,
-    user_name,
     _loaded_at,
     _source_file
 from deduped
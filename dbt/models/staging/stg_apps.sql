@@ -1,11 +1,28 @@
 -- models/staging/stg_apps.sql
 -- Cleans your apps_catalog data: normalizes types, fills nulls, deduplicates.
--- Materialized as a VIEW so it always reflects the latest raw data.
+--
+-- INCREMENTAL STAGING:
+--   First run  : full load + row_number() dedup over the whole catalog
+--   Later runs : only raw rows where _loaded_at > MAX(_loaded_at) already staged.
+--                unique_key='app_id' + delete+insert → the latest version of an app replaces
+--                the staged one (latest-wins, same as the old view).
 
-{{ config(materialized='view') }}
+{{
+    config(
+        materialized='incremental',
+        unique_key='app_id',
+        incremental_strategy='delete+insert',
+        on_schema_change='sync_all_columns'
+    )
+}}
 
 with source as (
     select * from {{ source('raw', 'apps_catalog') }}
+
+    -- INCREMENTAL FILTER: only raw rows from loads since last run
+    {% if is_incremental() %}
+        where _loaded_at > (select coalesce(max(_loaded_at), '') from {{ this }})
+    {% endif %}
 ),
 
 cleaned as (
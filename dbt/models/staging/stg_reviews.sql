@@ -1,8 +1,29 @@
 -- models/staging/stg_reviews.sql
-{{ config(materialized='view') }}
+-- Cleans raw reviews: casts types, drops invalid rows, deduplicates on review_id.
+--
+-- INCREMENTAL STAGING:
+--   First run  : full load + row_number() dedup over the whole raw history
+--   Later runs : only raw rows where _loaded_at > MAX(_loaded_at) already staged,
+--                anti-joined against review_ids that are already staged.
+--                The dedup window then only covers the new batch → O(batch), not O(history).
+--
+-- First-seen wins (same as before): a review_id already staged is never replaced.
+
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='append',
+        on_schema_change='sync_all_columns'
+    )
+}}
 
 with source as (
     select * from {{ source('raw', 'apps_reviews') }}
+
+    -- INCREMENTAL FILTER: only raw rows from batches loaded since last run
+    {% if is_incremental() %}
+        where _loaded_at > (select coalesce(max(_loaded_at), '') from {{ this }})
+    {% endif %}
 ),
 
 normalized as (
@@ -22,13 +43,22 @@ normalized as (
 ),
 
 validated as (
-    select *
-    from normalized
-    where review_id   is not null
-      and app_id      is not null
-      and rating      between 1 and 5
-      and reviewed_at is not null
-      and reviewed_at >= '2015-01-01'
+    select n.*
+    from normalized n
+
+    -- ANTI-JOIN: skip review_ids that an earlier batch already staged
+    {% if is_incremental() %}
+    left join {{ this }} existing on n.review_id = existing.review_id
+    {% endif %}
+
+    where n.review_id   is not null
+      and n.app_id      is not null
+      and n.rating      between 1 and 5
+      and n.reviewed_at is not null
+      and n.reviewed_at >= '2015-01-01'
+    {% if is_incremental() %}
+      and existing.review_id is null
+    {% endif %}
 ),
 
 deduped as (
@@ -48,4 +78,4 @@ select
     _loaded_at,
     _source_file
 from deduped
-where rn = 1
\ No newline at end of file
+where rn = 1
@@ -3,23 +3,46 @@
 {{
     config(
         target_schema='snapshots',
-        unique_key='developer_name',
+        unique_key='app_id',
         strategy='check',
-        check_cols=['developer_name'],
-        invalidate_hard_deletes=True
+        check_cols=['developer_name']
     )
 }}
 
--- Reads directly from the raw source (NOT ref) because staging views
+-- Developer history keyed on a STABLE identity: the app (appId) → developer relationship.
+-- Keying on the name itself made a rename look like one deleted + one brand-new developer;
+-- now a rename closes the app's current row and opens a new version.
+--
+-- Reads directly from the raw source (NOT ref) because staging models
 -- don't exist yet when `dbt snapshot` runs — it runs before `dbt build`.
--- On first run: every developer gets one open-ended row (dbt_valid_to = NULL).
--- On future runs: if a name changes, old row is closed and a new one opens.
+--
+-- Only rows from the NEWEST catalog load are considered, and only those whose developer
+-- differs from the current snapshot record (or apps not seen before) are handed to the
+-- snapshot — its cost is proportional to changed apps, not to catalog history.
+-- (No invalidate_hard_deletes: unchanged apps are deliberately absent from the input.)
 
-select distinct
-    trim(coalesce(developer, 'Unknown'))  as developer_name,
-    _loaded_at                            as updated_at
-from {{ source('raw', 'apps_catalog') }}
-where developer is not null
-  and trim(developer) != ''
+with latest_load as (
+    select
+        trim(appId)                           as app_id,
+        trim(coalesce(developer, 'Unknown'))  as developer_name,
+        _loaded_at                            as updated_at
+    from {{ source('raw', 'apps_catalog') }}
+    where appId is not null
+      and developer is not null
+      and trim(developer) != ''
+      and _loaded_at = (select max(_loaded_at) from {{ source('raw', 'apps_catalog') }})
+    qualify row_number() over (partition by trim(appId) order by trim(coalesce(developer, 'Unknown'))) = 1
+)
 
-{% endsnapshot %}
\ No newline at end of file
+select l.*
+from latest_load l
+
+{% if adapter.get_relation(database=this.database, schema=this.schema, identifier=this.identifier) %}
+left join {{ this }} cur
+       on cur.app_id = l.app_id
+      and cur.dbt_valid_to is null
+where cur.app_id is null
+   or cur.developer_name != l.developer_name
+{% endif %}
+
+{% endsnapshot %}
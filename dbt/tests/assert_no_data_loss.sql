@@ -1,8 +1,32 @@
 -- tests/assert_no_data_loss.sql
 -- fact_reviews should never have MORE unique review_ids than stg_reviews.
 -- If it does, something was deleted upstream and we have ghost rows in the fact table.
+--
+-- batch mode : the latest batch in dq_review_stats must reach fact_reviews whole — fewer
+--              fact rows than staged rows means reviews were dropped by the dim_apps /
+--              dim_date inner joins (unknown app, date outside dim_date)
+-- deep mode  : recounts both tables in full (catches upstream deletes / ghost rows)
+-- depends_on: {{ ref('fact_reviews') }}
+-- depends_on: {{ ref('stg_reviews') }}
+
+{{ config(tags=['dq_batch']) }}
+
+{% if dq_deep_check() %}
 
 select
     (select count(distinct review_id) from {{ ref('fact_reviews') }})  as fact_count,
     (select count(distinct review_id) from {{ ref('stg_reviews') }})   as staging_count
-where fact_count > staging_count
\ No newline at end of file
+where fact_count > staging_count
+
+{% else %}
+
+select
+    batch_loaded_at,
+    source_file,
+    fact_reviews     as fact_count,
+    staged_reviews   as staging_count
+from {{ ref('dq_review_stats') }}
+where batch_loaded_at = {{ latest_batch_loaded_at() }}
+  and fact_reviews != staged_reviews
+
+{% endif %}
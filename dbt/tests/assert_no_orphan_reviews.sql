@@ -1,5 +1,14 @@
 -- Fails if any review in fact_reviews has no matching app in dim_apps
+-- batch mode : only reviews from the latest load batch
+-- deep mode  : the whole fact table
+-- depends_on: {{ ref('dq_review_stats') }}
+
+{{ config(tags=['dq_batch']) }}
+
 select fr.review_id, fr.app_key
 from {{ ref('fact_reviews') }} fr
 left join {{ ref('dim_apps') }} da on fr.app_key = da.app_key
-where da.app_key is null
\ No newline at end of file
+where da.app_key is null
+{% if not dq_deep_check() %}
+  and fr._loaded_at = {{ latest_batch_loaded_at() }}
+{% endif %}
@@ -1,10 +1,21 @@
 -- tests/assert_rating_distribution_sane.sql
 -- Fails if any single star rating makes up >95% of all reviews.
 -- Catches silent data quality issues (e.g. all reviews scraped as 5-star).
+--
+-- batch mode : only the latest load batch — where a scraping anomaly shows up first.
+--              Batches smaller than var('dq_min_batch_rows', 50) are skipped: a handful
+--              of reviews can legitimately all be 5-star.
+-- deep mode  : the whole fact table
+-- depends_on: {{ ref('dq_review_stats') }}
+
+{{ config(tags=['dq_batch']) }}
 
 with counts as (
     select rating, count(*) as n
     from {{ ref('fact_reviews') }}
+    {% if not dq_deep_check() %}
+    where _loaded_at = {{ latest_batch_loaded_at() }}
+    {% endif %}
     group by rating
 ),
 total as (
@@ -14,4 +25,7 @@ select
     c.rating,
     round(c.n * 100.0 / t.total, 1) as pct
 from counts c cross join total t
-where c.n * 100.0 / t.total > 95
\ No newline at end of file
+where c.n * 100.0 / t.total > 95
+{% if not dq_deep_check() %}
+  and t.total >= {{ var('dq_min_batch_rows', 50) }}
+{% endif %}
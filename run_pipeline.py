@@ -1,73 +1,85 @@
 """
 Main Pipeline Runner
 Executes the complete data pipeline from ingestion to dashboard
+
+Usage (from repo root):
+    python run_pipeline.py                              # all stages
+    python run_pipeline.py --stages transform,serve     # only the listed stages, in pipeline order
+    python run_pipeline.py --list                       # show stage names
+
+Stage modules are imported only when their stage runs, so a cheap stage
+doesn't pay for the scraper, SciPy or Plotly imports of the others.
 """
+import argparse
+import importlib
 import sys
 import os
 
-def run_pipeline():
-    """Run all pipeline steps in sequence"""
-    
+# name → (module, title, error label, stop the pipeline on error?)
+STAGES = {
+    'ingest':    ('src.01_ingest_data', 'Data Ingestion', 'data ingestion', False),
+    'transform': ('src.02_transform_data', 'Data Transformation', 'data transformation', True),
+    'features':  ('src.05_extract_text_features', 'Extracting Text Features', 'text feature extraction', True),
+    'dedup':     ('src.06_detect_near_duplicates', 'Detecting Near-Duplicate Reviews', 'near-duplicate detection', True),
+    'serve':     ('src.03_create_serving_layer', 'Creating Serving Layer', 'serving layer creation', True),
+    'dashboard': ('src.04_create_dashboard', 'Creating Dashboard', 'dashboard creation', True),
+}
+
+def run_pipeline(stages=None):
+    """Run the selected pipeline steps (default: all) in sequence"""
+    stages = [name for name in STAGES if stages is None or name in stages]
+
     print("=" * 60)
     print("STARTING DATA PIPELINE")
     print("=" * 60)
-    
-    # Step 1: Data Ingestion
-    print("\n[STEP 1/4] Data Ingestion")
-    print("-" * 60)
-    try:
-        import importlib
-        mod = importlib.import_module('src.01_ingest_data')
-        mod.main()
-    except Exception as e:
-        print(f"ERROR in data ingestion: {e}")
-        print("Continuing with existing raw data if available...")
-    
-    # Step 2: Data Transformation
-    print("\n[STEP 2/4] Data Transformation")
-    print("-" * 60)
-    try:
-        import importlib
-        mod = importlib.import_module('src.02_transform_data')
-        mod.main()
-    except Exception as e:
-        print(f"ERROR in data transformation: {e}")
-        sys.exit(1)
-    
-    # Step 3: Serving Layer
-    print("\n[STEP 3/4] Creating Serving Layer")
-    print("-" * 60)
-    try:
-        import importlib
-        mod = importlib.import_module('src.03_create_serving_layer')
-        mod.main()
-    except Exception as e:
-        print(f"ERROR in serving layer creation: {e}")
-        sys.exit(1)
-    
-    # Step 4: Dashboard
-    print("\n[STEP 4/4] Creating Dashboard")
-    print("-" * 60)
-    try:
-        import importlib
-        mod = importlib.import_module('src.04_create_dashboard')
-        mod.main()
-    except Exception as e:
-        print(f"ERROR in dashboard creation: {e}")
-        sys.exit(1)
-    
+
+    for step, name in enumerate(stages, start=1):
+        module, title, label, fatal = STAGES[name]
+        print(f"\n[STEP {step}/{len(stages)}] {title}")
+        print("-" * 60)
+        try:
+            mod = importlib.import_module(module)
+            mod.main()
+        except Exception as e:
+            print(f"ERROR in {label}: {e}")
+            if fatal:
+                sys.exit(1)
+            print("Continuing with existing raw data if available...")
+
     print("\n" + "=" * 60)
     print("PIPELINE COMPLETED SUCCESSFULLY!")
     print("=" * 60)
     print("\nOutputs:")
     print("  - Raw data: data/raw/")
     print("  - Processed data: data/processed/")
+    print("  - Text features: data/processed/app_text_features.csv")
+    print("  - Near-duplicates: data/processed/review_duplicates.csv")
     print("  - Dashboard: data/processed/dashboard.html")
 
+def parse_stages(value):
+    """'transform,serve' → ['transform', 'serve'] (validated)"""
+    stages = [s.strip() for s in value.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown stage(s) {', '.join(unknown)} — choose from {', '.join(STAGES)}"
+        )
+    return stages
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the data pipeline")
+    parser.add_argument("--stages", type=parse_stages, help=f"Comma-separated subset of: {','.join(STAGES)}")
+    parser.add_argument("--list", action="store_true", help="List the stages and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (module, title, _, _) in STAGES.items():
+            print(f"{name:<10} {title} ({module})")
+        sys.exit(0)
+
     # Ensure we're in the right directory
     if not os.path.exists('data'):
         print("ERROR: Run this script from the project root directory")
         sys.exit(1)
-    
-    run_pipeline()
\ No newline at end of file
+
+    run_pipeline(args.stages)
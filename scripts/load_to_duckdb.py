@@ -14,13 +14,24 @@ For an incremental batch (new reviews CSV):
 """
 
 import duckdb
-import pandas as pd
-import json
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
 import os
 import sys
 import argparse
 from datetime import datetime
 
+from review_search import update_search_index
+
+# Shared data-access helpers live in src/
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.data_access import load_processed_table
+
 DB_PATH = "data/app_market.duckdb"
 
 
@@ -31,6 +42,19 @@ def get_con():
     return con
 
 
+def with_load_columns(table, source_file):
+    """
+    Arrow table as stored in raw: timestamps as "YYYY-MM-DD HH:MM:SS" text (what the
+    CSVs hold and stg_* try_cast), plus the _loaded_at / _source_file audit columns.
+    """
+    for i, field in enumerate(table.schema):
+        if pa.types.is_timestamp(field.type):
+            seconds = table.column(i).cast(pa.timestamp("s"), safe=False)
+            table = table.set_column(i, field.name, pc.strftime(seconds, format="%Y-%m-%d %H:%M:%S"))
+    table = table.append_column("_loaded_at", pa.repeat(pa.scalar(datetime.utcnow().isoformat()), table.num_rows))
+    return table.append_column("_source_file", pa.repeat(pa.scalar(source_file), table.num_rows))
+
+
 def load_apps(con):
     """Load data/processed/apps_catalog.csv → raw.apps_catalog"""
     path = "data/processed/apps_catalog.csv"
@@ -38,14 +62,13 @@ def load_apps(con):
         print(f"  [SKIP] {path} not found")
         return
 
-    df = pd.read_csv(path)
-    df["_loaded_at"] = datetime.utcnow().isoformat()
-    df["_source_file"] = "apps_catalog.csv"
+    # Memory-maps the Arrow copy written by 02_transform_data (CSV if that is newer)
+    table = with_load_columns(load_processed_table("apps_catalog"), "apps_catalog.csv")
 
     con.execute("DROP TABLE IF EXISTS raw.apps_catalog")
-    con.register("_apps", df)
+    con.register("_apps", table)
     con.execute("CREATE TABLE raw.apps_catalog AS SELECT * FROM _apps")
-    print(f"  [OK] raw.apps_catalog — {len(df)} rows")
+    print(f"  [OK] raw.apps_catalog — {table.num_rows} rows")
 
 
 def load_reviews(con, extra_file=None):
@@ -65,12 +88,10 @@ def load_reviews(con, extra_file=None):
     ).fetchone()[0]
 
     if not table_exists:
-        df = pd.read_csv(path)
-        df["_loaded_at"] = datetime.utcnow().isoformat()
-        df["_source_file"] = "apps_reviews.csv"
-        con.register("_reviews", df)
+        table = with_load_columns(load_processed_table("apps_reviews"), "apps_reviews.csv")
+        con.register("_reviews", table)
         con.execute("CREATE TABLE raw.apps_reviews AS SELECT * FROM _reviews")
-        print(f"  [OK] raw.apps_reviews created — {len(df)} rows")
+        print(f"  [OK] raw.apps_reviews created — {table.num_rows} rows")
     else:
         # Check if already loaded
         already = con.execute(
@@ -79,12 +100,10 @@ def load_reviews(con, extra_file=None):
         if already:
             print(f"  [SKIP] apps_reviews.csv already loaded ({already} rows present)")
         else:
-            df = pd.read_csv(path)
-            df["_loaded_at"] = datetime.utcnow().isoformat()
-            df["_source_file"] = "apps_reviews.csv"
-            con.register("_reviews", df)
+            table = with_load_columns(load_processed_table("apps_reviews"), "apps_reviews.csv")
+            con.register("_reviews", table)
             con.execute("INSERT INTO raw.apps_reviews SELECT * FROM _reviews")
-            print(f"  [OK] raw.apps_reviews appended — {len(df)} rows")
+            print(f"  [OK] raw.apps_reviews appended — {table.num_rows} rows")
 
     # ── Incremental batch ─────────────────────────────────────────────────────
     if extra_file:
@@ -102,12 +121,11 @@ def load_reviews(con, extra_file=None):
             print(f"  [SKIP] {fname} already loaded ({already} rows present)")
             return
 
-        # Read JSONL or CSV
+        # Read JSONL or CSV straight into Arrow
         if extra_file.endswith(".jsonl"):
-            records = [json.loads(l) for l in open(extra_file, encoding="utf-8") if l.strip()]
-            df = pd.DataFrame(records)
+            table = pa_json.read_json(extra_file)
         else:
-            df = pd.read_csv(extra_file)
+            table = pa_csv.read_csv(extra_file)
 
         # Normalize column names to match the base table
         ALIASES = {
@@ -121,27 +139,32 @@ def load_reviews(con, extra_file=None):
         }
         for canonical, aliases in ALIASES.items():
             for alias in aliases:
-                if alias in df.columns and canonical not in df.columns:
-                    df = df.rename(columns={alias: canonical})
+                if alias in table.column_names and canonical not in table.column_names:
+                    table = table.rename_columns([canonical if c == alias else c for c in table.column_names])
                     print(f"    schema drift: renamed '{alias}' → '{canonical}'")
 
-        df["_loaded_at"] = datetime.utcnow().isoformat()
-        df["_source_file"] = fname
+        table = with_load_columns(table, fname)
 
-        # Add missing columns as NULL so INSERT doesn't fail
+        # Add missing columns as NULL and line columns up with the base table,
+        # so the positional INSERT doesn't fail
         existing_cols = [
             r[0] for r in con.execute(
                 "SELECT column_name FROM information_schema.columns "
-                "WHERE table_schema='raw' AND table_name='apps_reviews'"
+                "WHERE table_schema='raw' AND table_name='apps_reviews' "
+                "ORDER BY ordinal_position"
             ).fetchall()
         ]
         for col in existing_cols:
-            if col not in df.columns:
-                df[col] = None
-
-        con.register("_batch", df)
+            if col not in table.column_names:
+                table = table.append_column(col, pa.nulls(table.num_rows))
+        dropped = [c for c in table.column_names if c not in existing_cols]
+        if dropped:
+            print(f"    schema drift: ignoring columns not in raw.apps_reviews: {', '.join(dropped)}")
+        table = table.select(existing_cols)
+
+        con.register("_batch", table)
         con.execute("INSERT INTO raw.apps_reviews SELECT * FROM _batch")
-        print(f"  [OK] Batch appended — {len(df)} rows from {fname}")
+        print(f"  [OK] Batch appended — {table.num_rows} rows from {fname}")
 
 
 def print_summary(con):
@@ -170,6 +193,7 @@ def main():
     con = get_con()
     load_apps(con)
     load_reviews(con, extra_file=args.new_reviews)
+    update_search_index(con)
     print_summary(con)
     con.close()
     print(f"\nDone. Database: {DB_PATH}")
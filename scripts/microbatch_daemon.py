@@ -0,0 +1,277 @@
+"""
+scripts/microbatch_daemon.py
+────────────────────────────
+Continuous micro-batch mode: keeps the serving layer fresh without re-running
+the whole pipeline.
+
+Each tick:
+  1. polls the apps that are due — apps with a high review velocity are polled
+     more often than quiet ones
+  2. keeps only reviews not seen before, cleans them with 02_transform_data
+  3. appends them as one micro-batch via load_to_duckdb.load_reviews
+  4. runs `dbt run --select stg_reviews+` — the incremental staging, fact and
+     agg_app_daily models only touch the new batch and the (app, day) cells it hits —
+     then only the batch-scoped data-quality tests (tag:dq_batch); the generic
+     unique/not_null tests scan whole tables and are left to the scheduled full build
+  5. publishes a snapshot, so the query service swaps to it and drops its cache
+
+A polled review counts as seen once it is in raw.apps_reviews (an anti-join in
+DuckDB each tick), so the reviews of a batch that failed to load are refetched. The static HTML dashboard
+(04_create_dashboard.py) is not regenerated; the query service endpoints are
+what reflect each batch.
+
+Freshness (review `at` → visible in the published KPIs) is appended per batch to
+data/processed/freshness_metrics.csv, with p50/p95/max and the SLO verdict.
+
+Usage (from repo root, after the initial pipeline + load + dbt build):
+    python scripts/microbatch_daemon.py
+    python scripts/microbatch_daemon.py --slo-minutes 60 --max-batches 1
+"""
+
+import csv
+import importlib
+import os
+import subprocess
+import sys
+import time
+import argparse
+from datetime import datetime
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+# Stage modules live in src/ (numbered names → importlib)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from load_to_duckdb import DB_PATH, get_con, load_reviews
+from query_service import publish_snapshot
+from review_search import update_search_index
+from src.data_access import fetch_arrow, fetch_df
+
+BATCH_DIR = "data/raw/microbatches"
+METRICS_PATH = "data/processed/freshness_metrics.csv"
+DBT_DIR = "dbt"
+
+POLL_REVIEW_COUNT = 50          # Newest reviews fetched per poll
+TARGET_NEW_PER_POLL = 5         # Poll often enough to expect ~5 new reviews per app per poll
+MIN_POLL_SECONDS = 5 * 60
+MAX_POLL_SECONDS = 24 * 3600
+VELOCITY_WINDOW_DAYS = 30
+VELOCITY_SMOOTHING = 0.3        # Weight of the latest observation in the velocity estimate
+REQUEST_INTERVAL = 1.0          # Seconds between scraper calls (same as 01_ingest_data)
+DEFAULT_SLO_MINUTES = 60
+LOCK_RETRY_SECONDS = 30         # Wait before re-polling when another process holds the write lock
+
+
+def poll_interval(velocity_per_day):
+    """Seconds until the next poll for an app receiving `velocity_per_day` reviews"""
+    if velocity_per_day <= 0:
+        return MAX_POLL_SECONDS
+    seconds = TARGET_NEW_PER_POLL / velocity_per_day * 86400
+    return min(MAX_POLL_SECONDS, max(MIN_POLL_SECONDS, seconds))
+
+
+def load_app_state(con):
+    """The app catalog and each app's recent review velocity (reviews/day)"""
+    apps = fetch_df(con, "SELECT appId, title FROM raw.apps_catalog")
+    rates = fetch_arrow(con, f"""
+        SELECT CAST(app_id AS VARCHAR) AS app_id, COUNT(*) * 1.0 / {VELOCITY_WINDOW_DAYS} AS per_day
+        FROM raw.apps_reviews
+        WHERE TRY_CAST("at" AS TIMESTAMP) >=
+              (SELECT MAX(TRY_CAST("at" AS TIMESTAMP)) FROM raw.apps_reviews) - INTERVAL {VELOCITY_WINDOW_DAYS} DAY
+        GROUP BY 1
+    """)
+    velocity = dict(zip(rates.column("app_id").to_pylist(), rates.column("per_day").to_pylist()))
+    return apps, velocity
+
+
+def unseen_review_ids(review_ids):
+    """The polled reviewIds not in raw.apps_reviews yet — an anti-join in DuckDB, not a Python set"""
+    con = duckdb.connect(DB_PATH, read_only=True)
+    try:
+        con.register("_polled", pa.table({"review_id": pa.array(review_ids, pa.string())}))
+        new_ids = fetch_arrow(con, """
+            SELECT DISTINCT p.review_id
+            FROM _polled p
+            WHERE NOT EXISTS (
+                SELECT 1 FROM raw.apps_reviews r
+                WHERE CAST(r."reviewId" AS VARCHAR) = p.review_id
+            )
+        """)
+    finally:
+        con.close()
+    return set(new_ids.column("review_id").to_pylist())
+
+
+def run_dbt():
+    """Incremental rebuild of everything downstream of stg_reviews + batch-scoped tests; True on success"""
+    for command in (["run", "--select", "stg_reviews+"], ["test", "--select", "tag:dq_batch"]):
+        result = subprocess.run(
+            ["dbt", *command, "--profiles-dir", "."],
+            cwd=DBT_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(result.stdout[-2000:])
+            print(f"  [ERROR] dbt {command[0]} failed (exit {result.returncode})")
+            return False
+    return True
+
+
+def record_freshness(batch_id, review_times, fetched_at, visible_at, slo_seconds):
+    """Append review-at → visible latency stats for one batch to the metrics CSV"""
+    latencies = (visible_at - pd.to_datetime(pd.Series(review_times))).dt.total_seconds()
+    row = {
+        "batch_id": batch_id,
+        "reviews": len(latencies),
+        "fetched_at": fetched_at.isoformat(),
+        "visible_at": visible_at.isoformat(),
+        "pipeline_seconds": round((visible_at - fetched_at).total_seconds(), 1),
+        "latency_p50_seconds": round(latencies.quantile(0.5), 1),
+        "latency_p95_seconds": round(latencies.quantile(0.95), 1),
+        "latency_max_seconds": round(latencies.max(), 1),
+        "slo_seconds": slo_seconds,
+        "slo_met": bool(latencies.quantile(0.95) <= slo_seconds),
+    }
+    new_file = not os.path.exists(METRICS_PATH)
+    with open(METRICS_PATH, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(row))
+        if new_file:
+            writer.writeheader()
+        writer.writerow(row)
+    return row
+
+
+def process_batch(records, apps, transform, slo_seconds, fetched_at, rejected_ids):
+    """
+    Clean, append, rebuild, publish one micro-batch; returns the freshness row (None on failure).
+    Reviews dropped by transform_reviews are added to rejected_ids: they never reach
+    raw.apps_reviews, and refetching them won't change that. If dbt fails after the load,
+    the rows are in raw and the next successful dbt run picks them up.
+    """
+    batch_id = fetched_at.strftime("%Y%m%dT%H%M%S")
+    reviews_clean = transform.transform_reviews(records, apps)
+    rejected_ids.update({r.get("reviewId") for r in records} - set(reviews_clean["reviewId"]))
+    if reviews_clean.empty:
+        print("  [SKIP] no valid reviews in batch")
+        return None
+
+    os.makedirs(BATCH_DIR, exist_ok=True)
+    fname = f"microbatch_{batch_id}.csv"
+    path = os.path.join(BATCH_DIR, fname)
+    reviews_clean.to_csv(path, index=False)
+
+    con = get_con()
+    try:
+        load_reviews(con, extra_file=path)
+        loaded = con.execute(
+            "SELECT COUNT(*) FROM raw.apps_reviews WHERE _source_file = ?", [fname]
+        ).fetchone()[0]
+        if loaded:
+            update_search_index(con)
+    finally:
+        con.close()  # Release the write lock before dbt opens the database
+    if not loaded:
+        print(f"  [ERROR] batch {batch_id} was not loaded; its reviews will be refetched")
+        return None
+
+    if not run_dbt():
+        return None
+    publish_snapshot()
+    visible_at = datetime.utcnow()
+
+    row = record_freshness(batch_id, reviews_clean["at"], fetched_at, visible_at, slo_seconds)
+    status = "OK" if row["slo_met"] else "SLO MISS"
+    print(f"  [{status}] batch {batch_id}: {row['reviews']} reviews, "
+          f"p95 latency {row['latency_p95_seconds'] / 60:.1f} min, pipeline {row['pipeline_seconds']:.0f}s")
+    return row
+
+
+def run(slo_minutes=DEFAULT_SLO_MINUTES, max_batches=None):
+    ingest = importlib.import_module("src.01_ingest_data")
+    transform = importlib.import_module("src.02_transform_data")
+
+    con = get_con()
+    apps, velocity = load_app_state(con)
+    con.close()
+
+    # Every app is due once at start-up; afterwards its velocity sets the pace
+    now = time.time()
+    next_poll = {app_id: now for app_id in apps["appId"]}
+    last_poll = {app_id: None for app_id in next_poll}
+    rejected_ids = set()
+    batches = 0
+    print(f"Micro-batch daemon started: {len(next_poll)} apps, SLO p95 ≤ {slo_minutes} min")
+
+    while max_batches is None or batches < max_batches:
+        due = sorted((t, a) for a, t in next_poll.items() if t <= time.time())
+        if not due:
+            time.sleep(max(1.0, min(next_poll.values()) - time.time()))
+            continue
+
+        fetched_at = datetime.utcnow()
+        polled = []
+        for _, app_id in due:
+            polled_at = time.time()
+            reviews = ingest.extract_app_reviews(app_id, count=POLL_REVIEW_COUNT)
+            for review in reviews:
+                review["app_id"] = app_id
+            polled.append((app_id, polled_at, reviews))
+            time.sleep(REQUEST_INTERVAL)  # Rate limiting
+
+        # A dbt build, load or publish run by hand holds the write lock, so even a read-only
+        # connection can fail; the polled apps stay due and are re-polled on the next tick
+        try:
+            new_ids = unseen_review_ids([r.get("reviewId") for _, _, reviews in polled for r in reviews])
+        except duckdb.Error as e:
+            print(f"  [ERROR] could not check polled reviews against the database: {e}")
+            time.sleep(LOCK_RETRY_SECONDS)
+            continue
+        new_ids -= rejected_ids
+        records = []
+        for app_id, polled_at, reviews in polled:
+            fresh = [r for r in reviews if r.get("reviewId") in new_ids]
+            records.extend(fresh)
+
+            # Update velocity from what this poll observed, then reschedule
+            if last_poll[app_id] is not None:
+                observed = len(fresh) / max((polled_at - last_poll[app_id]) / 86400, 1e-6)
+                velocity[app_id] = (
+                    VELOCITY_SMOOTHING * observed
+                    + (1 - VELOCITY_SMOOTHING) * velocity.get(app_id, 0)
+                )
+            last_poll[app_id] = polled_at
+            next_poll[app_id] = polled_at + poll_interval(velocity.get(app_id, 0))
+
+        print(f"Polled {len(due)} apps: {len(records)} new reviews")
+        if records:
+            try:
+                row = process_batch(records, apps, transform, slo_minutes * 60, fetched_at, rejected_ids)
+            except Exception as e:
+                print(f"  [ERROR] micro-batch failed: {e}")
+                row = None
+            if row is not None:
+                batches += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Continuous micro-batch ingest → serving loop")
+    parser.add_argument("--slo-minutes", type=float, default=DEFAULT_SLO_MINUTES,
+                        help="Freshness SLO: p95 review-at → visible latency (default 60)")
+    parser.add_argument("--max-batches", type=int, help="Stop after N micro-batches (default: run forever)")
+    args = parser.parse_args()
+
+    if not os.path.exists("data/processed"):
+        print("ERROR: Run this script from the repo root (where data/ lives)")
+        sys.exit(1)
+
+    try:
+        run(args.slo_minutes, args.max_batches)
+    except KeyboardInterrupt:
+        print("\nMicro-batch daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
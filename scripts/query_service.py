@@ -0,0 +1,419 @@
+"""
+scripts/query_service.py
+────────────────────────
+Local HTTP/JSON query service over the serving tables (agg_app_kpis,
+agg_daily_metrics, agg_app_daily).
+
+DuckDB allows a single writer, so the service never opens the live database.
+Instead, `publish` copies data/app_market.duckdb to an immutable snapshot
+(data/snapshots/<id>/app_market.duckdb) and flips data/snapshots/CURRENT to it.
+The service keeps a pool of read-only connections on the current snapshot,
+polls CURRENT, and when a new snapshot is published it swaps the pool and
+clears its LRU result cache. Loads and dbt builds can run against the live
+file while dashboards keep querying.
+
+Usage (from repo root):
+    python scripts/query_service.py publish          # after load_to_duckdb.py + dbt build
+    python scripts/query_service.py serve --port 8765
+
+Endpoints (GET, JSON):
+    /health
+    /apps/kpis?app_id=com.example.notes                (app_id optional)
+    /metrics/daily?app_id=...&start=2025-01-01&end=... (all params optional)
+    /trends?days=30                                    (last N days vs the N before)
+"""
+
+import duckdb
+import json
+import os
+import sys
+import glob
+import queue
+import shutil
+import argparse
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, date
+from decimal import Decimal
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Shared data-access helpers live in src/
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.data_access import result_batches
+
+DB_PATH = "data/app_market.duckdb"
+SNAPSHOT_DIR = "data/snapshots"
+CURRENT_POINTER = os.path.join(SNAPSHOT_DIR, "CURRENT")
+KEEP_SNAPSHOTS = 3
+
+
+# ── Snapshot publishing ──────────────────────────────────────────────────────
+
+def publish_snapshot(db_path=DB_PATH):
+    """Checkpoint the live database, copy it to a new snapshot file and point CURRENT at it"""
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+
+    # Opening read-write also fails fast if a loader still holds the write lock.
+    # The connection stays open until the copy is in place: it holds the exclusive
+    # lock, so no loader can write to the file while it is being copied.
+    con = duckdb.connect(db_path)
+    try:
+        con.execute("CHECKPOINT")
+
+        # One directory per snapshot: the file keeps its name, so the catalog name that
+        # dbt bakes into view definitions ("app_market") still resolves
+        snapshot_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        snapshot_dir = os.path.join(SNAPSHOT_DIR, snapshot_id)
+        os.makedirs(snapshot_dir)
+        path = os.path.join(snapshot_dir, os.path.basename(db_path))
+        shutil.copy2(db_path, path + ".tmp")
+        os.replace(path + ".tmp", path)
+    finally:
+        con.close()
+
+    with open(CURRENT_POINTER + ".tmp", "w", encoding="utf-8") as f:
+        f.write(snapshot_id)
+    os.replace(CURRENT_POINTER + ".tmp", CURRENT_POINTER)
+
+    # Old snapshots may still be open by a running service; unlinking is safe on POSIX
+    snapshots = sorted(d for d in glob.glob(os.path.join(SNAPSHOT_DIR, "*")) if os.path.isdir(d))
+    for old in snapshots[:-KEEP_SNAPSHOTS]:
+        shutil.rmtree(old, ignore_errors=True)
+
+    print(f"  [OK] snapshot published — {path}")
+    return path
+
+
+def current_snapshot(db_path=DB_PATH):
+    """Path of the currently published snapshot, or None"""
+    if not os.path.exists(CURRENT_POINTER):
+        return None
+    with open(CURRENT_POINTER, "r", encoding="utf-8") as f:
+        snapshot_id = f.read().strip()
+    path = os.path.join(SNAPSHOT_DIR, snapshot_id, os.path.basename(db_path))
+    return path if os.path.exists(path) else None
+
+
+# ── Connection pool & result cache ───────────────────────────────────────────
+
+class PoolRetired(Exception):
+    """The pool was swapped out for a newer snapshot; retry on the current one"""
+
+
+class ConnectionPool:
+    """Fixed-size pool of read-only cursors on one snapshot file"""
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self._root = duckdb.connect(path, read_only=True)
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._root.cursor())
+        self._lock = threading.Lock()
+        self._leases = 0
+        self._retired = False
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._retired:
+                raise PoolRetired(self.path)
+            self._leases += 1
+        try:
+            con = self._idle.get()
+            try:
+                yield con
+            finally:
+                self._idle.put(con)
+        finally:
+            with self._lock:
+                self._leases -= 1
+                close_now = self._retired and self._leases == 0
+            if close_now:
+                self.close()
+
+    def retire(self):
+        """Stop handing out cursors; close once every checked-out cursor is returned"""
+        with self._lock:
+            self._retired = True
+            close_now = self._leases == 0
+        if close_now:
+            self.close()
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get().close()
+        self._root.close()
+
+
+class LRUCache:
+    """Thread-safe LRU cache of query results"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# ── Queries ──────────────────────────────────────────────────────────────────
+
+def query_app_kpis(con, app_id=None):
+    sql = "SELECT * FROM agg_app_kpis"
+    params = []
+    if app_id:
+        sql += " WHERE app_id = ?"
+        params.append(app_id)
+    return con.execute(sql + " ORDER BY num_reviews DESC", params)
+
+
+def query_daily_metrics(con, app_id=None, start=None, end=None):
+    filters = []
+    params = []
+    if start:
+        filters.append("dt.date >= CAST(? AS DATE)")
+        params.append(start)
+    if end:
+        filters.append("dt.date <= CAST(? AS DATE)")
+        params.append(end)
+
+    if app_id:
+        filters.append("a.app_id = ?")
+        params.append(app_id)
+        where = " AND ".join(filters) or "true"
+        sql = f"""
+            SELECT dt.date,
+                   SUM(d.review_count)                                     AS daily_review_count,
+                   ROUND(SUM(d.rating_sum) * 1.0 / SUM(d.review_count), 2) AS daily_avg_rating,
+                   SUM(d.low_rating_count)                                 AS daily_low_rating_count
+            FROM agg_app_daily d
+            JOIN dim_apps a ON d.app_key = a.app_key
+            JOIN dim_date dt ON d.date_key = dt.date_key
+            WHERE {where}
+            GROUP BY dt.date
+            ORDER BY dt.date
+        """
+    else:
+        where = " AND ".join(filters) or "true"
+        sql = f"SELECT * FROM agg_daily_metrics dt WHERE {where} ORDER BY dt.date"
+    return con.execute(sql, params)
+
+
+def query_trends(con, days=30):
+    """Per-app review volume and rating for the last `days` days vs the `days` before"""
+    sql = """
+        WITH bounds AS (
+            SELECT MAX(dt.date) AS last_date
+            FROM agg_app_daily d JOIN dim_date dt ON d.date_key = dt.date_key
+        ),
+        windows AS (
+            SELECT d.app_key,
+                   CASE WHEN dt.date > b.last_date - CAST(? AS INTEGER) THEN 'recent' ELSE 'previous' END AS period,
+                   d.review_count, d.rating_sum
+            FROM agg_app_daily d
+            JOIN dim_date dt ON d.date_key = dt.date_key
+            CROSS JOIN bounds b
+            WHERE dt.date > b.last_date - 2 * CAST(? AS INTEGER)
+        ),
+        per_app AS (
+            SELECT app_key,
+                   SUM(review_count) FILTER (WHERE period = 'recent')   AS recent_reviews,
+                   SUM(review_count) FILTER (WHERE period = 'previous') AS previous_reviews,
+                   SUM(rating_sum)   FILTER (WHERE period = 'recent')   AS recent_rating_sum,
+                   SUM(rating_sum)   FILTER (WHERE period = 'previous') AS previous_rating_sum
+            FROM windows
+            GROUP BY app_key
+        )
+        SELECT a.app_id,
+               a.app_name                                                       AS title,
+               COALESCE(p.recent_reviews, 0)                                    AS recent_reviews,
+               COALESCE(p.previous_reviews, 0)                                  AS previous_reviews,
+               ROUND((COALESCE(p.recent_reviews, 0) - p.previous_reviews) * 100.0
+                     / NULLIF(p.previous_reviews, 0), 1)                        AS volume_change_pct,
+               ROUND(p.recent_rating_sum * 1.0 / NULLIF(p.recent_reviews, 0), 2)     AS recent_avg_rating,
+               ROUND(p.previous_rating_sum * 1.0 / NULLIF(p.previous_reviews, 0), 2) AS previous_avg_rating
+        FROM per_app p
+        JOIN dim_apps a ON p.app_key = a.app_key
+        ORDER BY recent_reviews DESC
+    """
+    return con.execute(sql, [days, days])
+
+
+ENDPOINTS = {
+    "/apps/kpis": (query_app_kpis, ["app_id"]),
+    "/metrics/daily": (query_daily_metrics, ["app_id", "start", "end"]),
+    "/trends": (query_trends, ["days"]),
+}
+
+
+def rows_as_dicts(cursor):
+    """Stream the result as Arrow record batches and convert them column-wise to JSON rows"""
+    return [row for batch in result_batches(cursor) for row in batch.to_pylist()]
+
+
+def json_default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        # SUM over integers is a HUGEINT, which Arrow hands back as decimal128
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    return str(obj)
+
+
+# ── Service ──────────────────────────────────────────────────────────────────
+
+class QueryService:
+    """Owns the current pool + cache and swaps both when a new snapshot is published"""
+
+    def __init__(self, pool_size=4, cache_entries=256, poll_seconds=5):
+        self.pool_size = pool_size
+        self.poll_seconds = poll_seconds
+        self.cache = LRUCache(cache_entries)
+        self.pool = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.refresh()
+
+    def refresh(self):
+        """Open a pool on the published snapshot if it changed; returns True on swap"""
+        path = current_snapshot()
+        if path is None or (self.pool and self.pool.path == path):
+            return False
+        new_pool = ConnectionPool(path, self.pool_size)
+        with self._lock:
+            old_pool, self.pool = self.pool, new_pool
+            self.cache.clear()
+        print(f"  [OK] serving snapshot {path}")
+        # In-flight queries on the old pool keep their cursor; the last one returned closes it
+        if old_pool:
+            old_pool.retire()
+        return True
+
+    def watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"  [ERROR] snapshot refresh failed: {e}")
+
+    def query(self, endpoint, params):
+        func, allowed = ENDPOINTS[endpoint]
+        kwargs = {k: params[k] for k in allowed if params.get(k)}
+        if "days" in kwargs:
+            kwargs["days"] = int(kwargs["days"])
+
+        while True:
+            with self._lock:
+                pool = self.pool
+            if pool is None:
+                raise RuntimeError("no snapshot published yet — run `query_service.py publish`")
+
+            key = (pool.path, endpoint, tuple(sorted(kwargs.items())))
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+            try:
+                with pool.connection() as con:
+                    body = json.dumps(rows_as_dicts(func(con, **kwargs)), default=json_default).encode("utf-8")
+            except PoolRetired:
+                continue  # Swapped between picking the pool and checking out a cursor
+            self.cache.put(key, body)
+            return body
+
+    def stop(self):
+        self._stop.set()
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+            if url.path == "/health":
+                snapshot = service.pool.path if service.pool else None
+                return self._send(200, json.dumps({"snapshot": snapshot}).encode("utf-8"))
+            if url.path not in ENDPOINTS:
+                return self._send(404, json.dumps({"error": f"unknown endpoint {url.path}"}).encode("utf-8"))
+
+            try:
+                self._send(200, service.query(url.path, params))
+            except (ValueError, duckdb.Error) as e:
+                self._send(400, json.dumps({"error": str(e)}).encode("utf-8"))
+            except RuntimeError as e:
+                self._send(503, json.dumps({"error": str(e)}).encode("utf-8"))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(host="127.0.0.1", port=8765, pool_size=4, cache_entries=256, poll_seconds=5):
+    service = QueryService(pool_size, cache_entries, poll_seconds)
+    threading.Thread(target=service.watch, daemon=True).start()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Query service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local query service over the serving layer")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("publish", help="Publish a read-only snapshot of the live database")
+    serve_parser = sub.add_parser("serve", help="Serve JSON endpoints from the current snapshot")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--pool-size", type=int, default=4)
+    serve_parser.add_argument("--cache-entries", type=int, default=256)
+    serve_parser.add_argument("--poll-seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    if not os.path.exists("data"):
+        print("ERROR: Run this script from the repo root (where data/ lives)")
+        sys.exit(1)
+
+    if args.command == "publish":
+        publish_snapshot()
+    else:
+        serve(args.host, args.port, args.pool_size, args.cache_entries, args.poll_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+scripts/review_search.py
+────────────────────────
+Full-text search over review content, backed by an inverted index that lives
+in the DuckDB database next to the raw tables (schema `search`):
+
+    search.review_docs      one row per indexed review (app, date, token count)
+    search.review_postings  one row per (term, review) with the term frequency
+
+The index is maintained incrementally: load_to_duckdb.py calls
+update_search_index() after every load, which reads only raw rows loaded after
+the stored _loaded_at watermark (search.index_state) and applies the same
+validation as stg_reviews plus fact_reviews' app and date joins, so every
+indexed review_id can reach fact_reviews.
+Queries are ranked with BM25 and can be filtered by app and date range.
+
+Usage (from repo root):
+    python scripts/review_search.py "sync crash"
+    python scripts/review_search.py "sync crash" --app com.example.notes --since 2025-01-01
+    python scripts/review_search.py --rebuild
+"""
+
+import duckdb
+import os
+import re
+import sys
+import time
+import argparse
+
+DB_PATH = "data/app_market.duckdb"
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# fact_reviews inner-joins dim_date, which spans these days (dbt/models/marts/dim_date.sql);
+# reviews outside it never reach fact_reviews, so they are not indexed either.
+DIM_DATE_START = "2019-01-01"
+DIM_DATE_END = "2027-12-31"
+
+# Tokens are runs of letters/digits; the SQL and Python tokenizers must agree.
+SQL_TOKEN_SPLIT = r"[^\p{L}\p{N}]+"
+PY_TOKEN_RE = re.compile(r"[^\W_]+")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "if", "in",
+    "into", "is", "it", "its", "of", "on", "or", "so", "that", "the", "their",
+    "then", "there", "these", "they", "this", "to", "was", "were", "will",
+    "with", "i", "me", "my", "you", "your", "we", "our", "have", "has", "had",
+}
+
+
+def tokenize(text):
+    """Split a query string into index terms (same rules as the indexer)"""
+    return [
+        t for t in PY_TOKEN_RE.findall(str(text).lower())
+        if len(t) > 1 and t not in STOPWORDS
+    ]
+
+
+def ensure_search_schema(con):
+    """Create the search schema and index tables if they don't exist"""
+    con.execute("CREATE SCHEMA IF NOT EXISTS search")
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS search.review_docs (
+            review_id   VARCHAR,
+            app_id      VARCHAR,
+            review_date DATE,
+            doc_len     INTEGER
+        )
+    """)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS search.review_postings (
+            term      VARCHAR,
+            review_id VARCHAR,
+            tf        INTEGER
+        )
+    """)
+    con.execute("CREATE TABLE IF NOT EXISTS search.index_state (watermark VARCHAR)")
+
+
+def update_search_index(con):
+    """
+    Index the reviews loaded into raw.apps_reviews since the last update.
+    Like stg_reviews, only rows with _loaded_at past the watermark are read and
+    only their review_ids are checked against the index, so cost is proportional
+    to the new batch, not to the history.
+    """
+    tables = con.execute(
+        "SELECT COUNT(*) FROM information_schema.tables "
+        "WHERE table_schema='raw' AND table_name IN ('apps_reviews', 'apps_catalog')"
+    ).fetchone()[0]
+    if tables < 2:
+        print("  [SKIP] search index: raw.apps_reviews / raw.apps_catalog not found")
+        return 0
+
+    ensure_search_schema(con)
+    watermark = con.execute("SELECT COALESCE(MAX(watermark), '') FROM search.index_state").fetchone()[0]
+    latest = con.execute(
+        "SELECT MAX(_loaded_at) FROM raw.apps_reviews WHERE _loaded_at > ?", [watermark]
+    ).fetchone()[0]
+    if latest is None:
+        print("  [SKIP] search index up to date")
+        return 0
+
+    # Rows of the new batches that pass stg_reviews' validation and fact_reviews' joins (a
+    # catalog app, a review date inside dim_date); first occurrence wins, review_ids already
+    # indexed are skipped
+    con.execute("""
+        CREATE OR REPLACE TEMP TABLE _search_new AS
+        WITH batch AS (
+            SELECT
+                TRY_CAST("reviewId" AS VARCHAR)             AS review_id,
+                TRY_CAST(app_id AS VARCHAR)                 AS app_id,
+                TRY_CAST(score AS INTEGER)                  AS rating,
+                TRY_CAST("at" AS TIMESTAMP)                 AS reviewed_at,
+                COALESCE(CAST(content AS VARCHAR), '')      AS content,
+                _loaded_at
+            FROM raw.apps_reviews
+            WHERE _loaded_at > ? AND _loaded_at <= ?
+        )
+        SELECT
+            review_id,
+            arg_min(app_id, _loaded_at)                 AS app_id,
+            arg_min(reviewed_at, _loaded_at)::DATE      AS review_date,
+            arg_min(content, _loaded_at)                AS content
+        FROM batch b
+        WHERE review_id IS NOT NULL
+          AND app_id IS NOT NULL
+          AND rating BETWEEN 1 AND 5
+          AND reviewed_at::DATE BETWEEN CAST(? AS DATE) AND CAST(? AS DATE)
+          AND app_id IN (SELECT trim(appId) FROM raw.apps_catalog)
+          AND NOT EXISTS (
+              SELECT 1 FROM search.review_docs d WHERE d.review_id = b.review_id
+          )
+        GROUP BY review_id
+    """, [watermark, latest, DIM_DATE_START, DIM_DATE_END])
+    new_docs = con.execute("SELECT COUNT(*) FROM _search_new").fetchone()[0]
+    if not new_docs:
+        con.execute("DROP TABLE _search_new")
+        set_watermark(con, latest)
+        print("  [SKIP] search index: no valid new reviews")
+        return 0
+
+    stopwords = sorted(STOPWORDS)
+    placeholders = ", ".join("?" for _ in stopwords)
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE _search_postings AS
+        SELECT term, review_id, COUNT(*)::INTEGER AS tf
+        FROM (
+            SELECT review_id,
+                   unnest(string_split_regex(lower(content), '{SQL_TOKEN_SPLIT}')) AS term
+            FROM _search_new
+        )
+        WHERE length(term) > 1
+          AND term NOT IN ({placeholders})
+        GROUP BY term, review_id
+    """, stopwords)
+
+    # Sorted by term so zone maps can skip row groups at query time
+    con.execute("""
+        INSERT INTO search.review_postings
+        SELECT term, review_id, tf FROM _search_postings ORDER BY term
+    """)
+    con.execute("""
+        INSERT INTO search.review_docs
+        SELECT n.review_id, n.app_id, n.review_date, COALESCE(p.doc_len, 0)
+        FROM _search_new n
+        LEFT JOIN (
+            SELECT review_id, SUM(tf)::INTEGER AS doc_len
+            FROM _search_postings GROUP BY review_id
+        ) p ON n.review_id = p.review_id
+    """)
+    con.execute("DROP TABLE _search_new")
+    con.execute("DROP TABLE _search_postings")
+    set_watermark(con, latest)
+    print(f"  [OK] search index — {new_docs} reviews indexed")
+    return new_docs
+
+
+def set_watermark(con, loaded_at):
+    """Remember the newest _loaded_at the index has read"""
+    con.execute("DELETE FROM search.index_state")
+    con.execute("INSERT INTO search.index_state VALUES (?)", [loaded_at])
+
+
+def rebuild_search_index(con):
+    """Drop and rebuild the whole index (e.g. after changing the tokenizer)"""
+    con.execute("DROP TABLE IF EXISTS search.review_postings")
+    con.execute("DROP TABLE IF EXISTS search.review_docs")
+    con.execute("DROP TABLE IF EXISTS search.index_state")
+    return update_search_index(con)
+
+
+def search_reviews(con, query, app_id=None, since=None, until=None, limit=20, match_all=False):
+    """
+    Return BM25-ranked matches as a list of
+    (review_id, app_id, review_date, score) tuples, best first.
+    """
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+
+    term_placeholders = ", ".join("?" for _ in terms)
+    params = [BM25_K1, BM25_B, BM25_K1] + terms
+
+    filters = []
+    if app_id:
+        filters.append("d.app_id = ?")
+        params.append(app_id)
+    if since:
+        filters.append("d.review_date >= CAST(? AS DATE)")
+        params.append(since)
+    if until:
+        filters.append("d.review_date <= CAST(? AS DATE)")
+        params.append(until)
+    where = ("WHERE " + " AND ".join(filters)) if filters else ""
+
+    having = ""
+    if match_all:
+        having = "HAVING COUNT(DISTINCT p.term) = ?"
+        params.append(len(terms))
+    params.append(limit)
+
+    sql = f"""
+        WITH params AS (
+            SELECT ?::DOUBLE AS k1, ?::DOUBLE AS b, ?::DOUBLE + 1 AS k1p1
+        ),
+        corpus AS (
+            SELECT COUNT(*) AS n_docs, AVG(doc_len) AS avg_len FROM search.review_docs
+        ),
+        p AS (
+            SELECT term, review_id, tf
+            FROM search.review_postings
+            WHERE term IN ({term_placeholders})
+        ),
+        df AS (
+            SELECT term, COUNT(*) AS df FROM p GROUP BY term
+        )
+        SELECT
+            d.review_id,
+            d.app_id,
+            d.review_date,
+            SUM(
+                ln(1 + (c.n_docs - df.df + 0.5) / (df.df + 0.5))
+                * p.tf * k.k1p1
+                / (p.tf + k.k1 * (1 - k.b + k.b * d.doc_len / c.avg_len))
+            ) AS score
+        FROM p
+        JOIN df ON p.term = df.term
+        JOIN search.review_docs d ON p.review_id = d.review_id
+        CROSS JOIN corpus c
+        CROSS JOIN params k
+        {where}
+        GROUP BY d.review_id, d.app_id, d.review_date
+        {having}
+        ORDER BY score DESC, d.review_id
+        LIMIT ?
+    """
+    # Deliberately fetchall, not the Arrow record-batch path (src/data_access.py): the
+    # ranking runs in DuckDB and LIMIT bounds the result to a few rows, which callers
+    # unpack as tuples — there is no large result to stream.
+    return con.execute(sql, params).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search review content")
+    parser.add_argument("query", nargs="?", help="Free-text query, e.g. \"sync crash\"")
+    parser.add_argument("--app", help="Only reviews of this app_id")
+    parser.add_argument("--since", help="Only reviews on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Only reviews on/before this date (YYYY-MM-DD)")
+    parser.add_argument("--limit", type=int, default=20, help="Max results (default 20)")
+    parser.add_argument("--all", action="store_true", help="Require every query term to match")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from scratch")
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print(f"ERROR: {DB_PATH} not found — run scripts/load_to_duckdb.py first")
+        sys.exit(1)
+
+    if args.rebuild or not args.query:
+        con = duckdb.connect(DB_PATH)
+        if args.rebuild:
+            rebuild_search_index(con)
+        else:
+            update_search_index(con)
+        con.close()
+        if not args.query:
+            return
+
+    con = duckdb.connect(DB_PATH, read_only=True)
+    start = time.perf_counter()
+    results = search_reviews(
+        con, args.query, app_id=args.app, since=args.since,
+        until=args.until, limit=args.limit, match_all=args.all
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    con.close()
+
+    print(f"{len(results)} results for '{args.query}' ({elapsed_ms:.1f} ms)")
+    for review_id, app_id, review_date, score in results:
+        print(f"  {score:6.2f}  {review_date}  {app_id:<40} {review_id}")
+
+
+if __name__ == "__main__":
+    main()
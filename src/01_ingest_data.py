@@ -1,35 +1,198 @@
 """
 Data Acquisition and Ingestion
 Extracts AI note-taking apps and reviews from Google Play Store
+
+Scraping can be sharded: the (app, country, lang) work list is partitioned by
+hash across N workers (local processes or other machines), each worker writes
+its own shard files, and a deterministic merge builds the canonical raw files.
+
+Usage (from repo root):
+    python src/01_ingest_data.py                                  # discover + scrape + merge
+    python src/01_ingest_data.py --workers 8 --locales us:en,gb:en,in:en
+    python src/01_ingest_data.py --discover-only --locales us:en,fr:fr
+    python src/01_ingest_data.py --shard 3/8                      # on any host sharing data/raw
+    python src/01_ingest_data.py --merge
+
+App discovery starts from seed search terms (data/raw/discovery_terms.txt, one
+per line, overrides the defaults) and expands through developer and look-alike
+searches. Probed queries and seen apps persist in data/raw/discovery_state.json,
+so re-runs only probe new candidates (--rediscover starts over).
 """
+import argparse
+import glob
+import hashlib
 import json
-from google_play_scraper import app, Sort, reviews, search
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 import time
 
-def get_ai_note_apps():
-    """Search for AI note-taking applications"""
-    print("Searching for AI note-taking apps...")
+DEFAULT_LOCALES = [('us', 'en')]
+WORK_LIST_PATH = 'data/raw/work_list.json'
+SHARD_DIR = 'data/raw/shards'
+SHARD_RE = re.compile(r'\.shard-(\d+)-of-(\d+)\.')
+
+# App discovery
+DEFAULT_SEARCH_TERMS = ["AI note", "AI notes", "note taking AI", "smart notes"]
+DISCOVERY_TERMS_PATH = 'data/raw/discovery_terms.txt'
+DISCOVERY_STATE_PATH = 'data/raw/discovery_state.json'
+RELEVANCE_KEYWORDS = ('note', 'notebook', 'memo', 'transcri', 'journal', 'meeting minutes')
+SEARCH_HITS = 30
+MAX_DISCOVERED_APPS = 500
+MAX_DISCOVERY_DEPTH = 2
+DISCOVERY_WORKERS = 4
+REQUEST_INTERVAL = 0.5   # Seconds between scraper calls across all threads
+
+class RateLimiter:
+    """Minimum interval between scraper calls, shared by all discovery threads"""
     
-    # Search terms for AI note-taking apps
-    search_terms = ["AI note", "AI notes", "note taking AI", "smart notes"]
-    app_ids = set()
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_call = 0.0
     
-    for term in search_terms:
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next_call - now)
+            self._next_call = max(now, self._next_call) + self.interval
+        if delay:
+            time.sleep(delay)
+
+def load_search_terms():
+    """Seed search terms: data/raw/discovery_terms.txt if present, else the defaults"""
+    if os.path.exists(DISCOVERY_TERMS_PATH):
+        with open(DISCOVERY_TERMS_PATH, 'r', encoding='utf-8') as f:
+            terms = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        if terms:
+            return terms
+    return list(DEFAULT_SEARCH_TERMS)
+
+def load_discovery_state():
+    """
+    Queries already probed, apps already seen/accepted and the unexplored frontier of earlier runs.
+    pending_queries maps query → depth; entries saved without a depth are expansions (depth 1).
+    """
+    state = {'probed_queries': [], 'visited_apps': [], 'accepted_apps': [], 'pending_queries': []}
+    if os.path.exists(DISCOVERY_STATE_PATH):
+        with open(DISCOVERY_STATE_PATH, 'r', encoding='utf-8') as f:
+            state.update(json.load(f))
+    pending = {}
+    for entry in state['pending_queries']:
+        if isinstance(entry, str):
+            pending.setdefault(entry, 1)
+        else:
+            pending.setdefault(entry['query'], entry['depth'])
+    state['pending_queries'] = pending
+    return state
+
+def save_discovery_state(probed_queries, visited_apps, accepted_apps, pending_queries):
+    """Persist the visited sets and frontier (with each query's depth) so re-runs only probe new candidates"""
+    state = {
+        'probed_queries': sorted(probed_queries),
+        'visited_apps': sorted(visited_apps),
+        'accepted_apps': sorted(accepted_apps),
+        'pending_queries': [{'query': q, 'depth': d} for q, d in pending_queries.items()]
+    }
+    with open(DISCOVERY_STATE_PATH + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(DISCOVERY_STATE_PATH + '.tmp', DISCOVERY_STATE_PATH)
+
+def is_relevant(result):
+    """Does a search hit look like a note-taking app? (used for expanded, non-seed hits)"""
+    text = ' '.join(str(result.get(k) or '') for k in ('title', 'genre', 'description')).lower()
+    return any(keyword in text for keyword in RELEVANCE_KEYWORDS)
+
+def expansion_queries(result):
+    """
+    Follow-up queries for an accepted app. google-play-scraper has no similar-apps or
+    developer-page endpoint, so both are approximated with search: the developer's
+    name (its catalog) and the app's title stem (look-alike apps).
+    """
+    queries = []
+    if result.get('developer'):
+        queries.append(str(result['developer']).strip())
+    title = str(result.get('title') or '').split(':')[0].split(' - ')[0].strip()
+    if title:
+        queries.append(title)
+    return queries
+
+def discover_apps(search_terms=None, max_apps=MAX_DISCOVERED_APPS, max_depth=MAX_DISCOVERY_DEPTH,
+                  workers=DISCOVERY_WORKERS, rediscover=False):
+    """
+    Breadth-first discovery frontier over search queries.
+    Depth 0 = seed terms (every hit accepted); deeper queries come from accepted apps
+    and their hits must pass is_relevant(). Each wave runs concurrently under the rate limit.
+    Unprobed queries keep their depth across runs, so a re-run resumes the same frontier
+    instead of promoting it to seeds, and nothing deeper than max_depth is ever queued.
+    Hits beyond max_apps are left unvisited and their query stays pending for a later run.
+    """
+    if rediscover and os.path.exists(DISCOVERY_STATE_PATH):
+        os.remove(DISCOVERY_STATE_PATH)
+    state = load_discovery_state()
+    probed_queries = set(state['probed_queries'])
+    visited_apps = set(state['visited_apps'])
+    accepted_apps = set(state['accepted_apps'])
+    limiter = RateLimiter(REQUEST_INTERVAL)
+    from google_play_scraper import search  # Deferred: only scraping runs need it
+    
+    def run_query(query):
+        limiter.wait()
         try:
-            results = search(term, n_hits=20)
-            for result in results:
-                app_ids.add(result['appId'])
+            return query, search(query, n_hits=SEARCH_HITS)
         except Exception as e:
-            print(f"Error searching for '{term}': {e}")
-            continue
+            print(f"Error searching for '{query}': {e}")
+            return query, []
+    
+    # query → depth: seeds are depth 0, resumed queries keep the depth they were found at
+    frontier = dict(state['pending_queries'])
+    for query in search_terms or load_search_terms():
+        frontier[query] = 0
+    frontier = {q: d for q, d in frontier.items() if q.lower() not in probed_queries and d <= max_depth}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while frontier and len(accepted_apps) < max_apps:
+            depth = min(frontier.values())
+            wave = [q for q, d in frontier.items() if d == depth]
+            print(f"Discovery depth {depth}: {len(wave)} queries")
+            for query, results in pool.map(run_query, wave):
+                cut_short = False
+                for result in results:
+                    app_id = result.get('appId')
+                    if not app_id or app_id in visited_apps:
+                        continue
+                    # Cap reached: leave this hit (and the rest) unvisited for a later run
+                    if len(accepted_apps) >= max_apps:
+                        cut_short = True
+                        break
+                    visited_apps.add(app_id)
+                    if depth > 0 and not is_relevant(result):
+                        continue
+                    accepted_apps.add(app_id)
+                    if depth < max_depth:
+                        for q in expansion_queries(result):
+                            if q.lower() not in probed_queries:
+                                frontier.setdefault(q, depth + 1)
+                # A query whose hits were cut short stays pending (with its depth) to resume
+                if not cut_short:
+                    del frontier[query]
+                    probed_queries.add(query.lower())
+            save_discovery_state(probed_queries, visited_apps, accepted_apps, frontier)
     
-    return list(app_ids)
+    print(f"Discovered {len(accepted_apps)} apps ({len(visited_apps)} candidates seen, {len(probed_queries)} queries probed)")
+    return sorted(accepted_apps)
 
-def extract_app_metadata(app_id):
+def get_ai_note_apps(rediscover=False):
+    """Search for AI note-taking applications"""
+    print("Searching for AI note-taking apps...")
+    return discover_apps(rediscover=rediscover)
+
+def extract_app_metadata(app_id, lang='en', country='us'):
     """Extract metadata for a single app"""
+    from google_play_scraper import app
     try:
-        result = app(app_id, lang='en', country='us')
+        result = app(app_id, lang=lang, country=country)
         return {
             'appId': result.get('appId'),
             'title': result.get('title'),
@@ -57,15 +220,16 @@ def convert_datetime_to_string(obj):
         return [convert_datetime_to_string(item) for item in obj]
     return obj
 
-def extract_app_reviews(app_id, count=50):
+def extract_app_reviews(app_id, count=50, lang='en', country='us'):
     """Extract reviews for a single app"""
+    from google_play_scraper import Sort, reviews
     try:
-        print(f"Extracting reviews for {app_id}...")
+        print(f"Extracting reviews for {app_id} ({country}/{lang})...")
         
         result, _ = reviews(
             app_id,
-            lang='en',
-            country='us',
+            lang=lang,
+            country=country,
             sort=Sort.NEWEST,
             count=count
         )
@@ -82,43 +246,233 @@ def extract_app_reviews(app_id, count=50):
         print(f"Error extracting reviews for {app_id}: {e}")
         return []
 
-def main():
-    # Step 1: Get list of AI note-taking apps
-    app_ids = get_ai_note_apps()
-    print(f"Processing {len(app_ids)} apps")
+def build_work_list(app_ids, locales=None):
+    """One work item per (app, country, lang), in a stable order"""
+    locales = locales or DEFAULT_LOCALES
+    return [
+        {'appId': app_id, 'country': country, 'lang': lang}
+        for app_id in sorted(app_ids)
+        for country, lang in locales
+    ]
+
+def work_list_digest(work_list):
+    """Short content hash of a work list"""
+    return hashlib.md5(json.dumps(work_list, sort_keys=True).encode('utf-8')).hexdigest()[:8]
+
+def save_work_list(work_list):
+    """
+    Persist the work list so every worker (on any host) shards the same items.
+    Each save starts a new run: its run id is stamped into every shard file, so a
+    merge can tell this run's shards from stale ones. Returns the run id.
+    """
+    run_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{work_list_digest(work_list)}"
+    with open(WORK_LIST_PATH, 'w', encoding='utf-8') as f:
+        json.dump({'run_id': run_id, 'items': work_list}, f, indent=2)
+    print(f"Saved {len(work_list)} work items to {WORK_LIST_PATH} (run {run_id})")
+    return run_id
+
+def load_work_list():
+    """Load the persisted work list → (run_id, work items)"""
+    with open(WORK_LIST_PATH, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    if isinstance(saved, list):  # Saved before run ids existed
+        return work_list_digest(saved), saved
+    return saved['run_id'], saved['items']
+
+def shard_of(item, num_shards):
+    """Stable hash partition of a work item (Python's hash() is salted per process)"""
+    key = f"{item['appId']}|{item['country']}|{item['lang']}".encode('utf-8')
+    return int(hashlib.md5(key).hexdigest(), 16) % num_shards
+
+def shard_paths(shard_index, num_shards):
+    """Catalog and review file paths of one shard"""
+    suffix = f"shard-{shard_index:03d}-of-{num_shards:03d}"
+    return (
+        os.path.join(SHARD_DIR, f"apps_catalog.{suffix}.json"),
+        os.path.join(SHARD_DIR, f"apps_reviews.{suffix}.jsonl")
+    )
+
+def ingest_shard(work_list, run_id, shard_index, num_shards, review_count=50):
+    """Scrape every work item of one shard and write that shard's files, stamped with the run id"""
+    items = [item for item in work_list if shard_of(item, num_shards) == shard_index]
+    print(f"Shard {shard_index}/{num_shards}: {len(items)} work items")
     
-    # Step 2: Extract metadata for each app
     apps_metadata = []
-    for app_id in app_ids:
-        print(f"Extracting metadata for {app_id}...")
-        metadata = extract_app_metadata(app_id)
+    all_reviews = []
+    for item in items:
+        app_id, country, lang = item['appId'], item['country'], item['lang']
+        
+        print(f"Extracting metadata for {app_id} ({country}/{lang})...")
+        metadata = extract_app_metadata(app_id, lang=lang, country=country)
         if metadata:
+            metadata['country'] = country
+            metadata['lang'] = lang
             apps_metadata.append(metadata)
         time.sleep(0.5)  # Rate limiting
-    
-    # Step 3: Save apps metadata
-    with open('data/raw/apps_catalog.json', 'w', encoding='utf-8') as f:
-        json.dump(apps_metadata, f, indent=2, ensure_ascii=False)
-    print(f"Saved {len(apps_metadata)} apps to apps_catalog.json")
-    
-    # Step 4: Extract reviews for each app
-    all_reviews = []
-    for app_id in app_ids:
-        reviews_list = extract_app_reviews(app_id, count=50)
-        for review in reviews_list:
+        
+        for review in extract_app_reviews(app_id, count=review_count, lang=lang, country=country):
             review['app_id'] = app_id
+            review['country'] = country
+            review['lang'] = lang
             all_reviews.append(review)
         time.sleep(1)  # Rate limiting
     
-    # Step 5: Save reviews
-    with open('data/raw/apps_reviews.jsonl', 'w', encoding='utf-8') as f:
+    # Write to temp files then rename, so a merge never reads a half-written shard
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    catalog_path, reviews_path = shard_paths(shard_index, num_shards)
+    with open(catalog_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'run_id': run_id, 'apps': apps_metadata}, f, indent=2, ensure_ascii=False)
+    with open(reviews_path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'run_id': run_id}) + '\n')  # Header line
         for review in all_reviews:
             f.write(json.dumps(review, ensure_ascii=False) + '\n')
-    print(f"Saved {len(all_reviews)} reviews to apps_reviews.jsonl")
+    os.replace(catalog_path + '.tmp', catalog_path)
+    os.replace(reviews_path + '.tmp', reviews_path)
+    
+    print(f"Shard {shard_index}/{num_shards}: {len(apps_metadata)} apps, {len(all_reviews)} reviews")
+    return len(apps_metadata), len(all_reviews)
+
+def _ingest_shard_task(args):
+    """Process-pool entry point"""
+    return ingest_shard(*args)
+
+def run_shards(work_list, run_id, num_workers=1, review_count=50):
+    """Run every shard of the work list, one local process per shard"""
+    # Remove shard files of an earlier run with a different shard count
+    for path in glob.glob(os.path.join(SHARD_DIR, '*.shard-*')):
+        os.remove(path)
+    
+    tasks = [(work_list, run_id, i, num_workers, review_count) for i in range(num_workers)]
+    if num_workers == 1:
+        return [ingest_shard(*tasks[0])]
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        return list(pool.map(_ingest_shard_task, tasks))
+
+def read_shard(path):
+    """(run_id, records) of one shard file; files written before run ids existed have run_id None"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            saved = json.load(f)
+            if isinstance(saved, list):
+                return None, saved
+            return saved['run_id'], saved['apps']
+        records = [json.loads(line) for line in f if line.strip()]
+    if records and set(records[0]) == {'run_id'}:
+        return records[0]['run_id'], records[1:]
+    return None, records
+
+def merge_shards(run_id=None):
+    """
+    Deterministically merge shard files into the canonical raw files.
+    The result is the same whatever the shard count or the order workers finished in.
+    Every shard must carry the run id of the saved work list (default) — a stale file
+    left by a worker that did not run this time is rejected, not merged.
+    """
+    catalog_files = sorted(glob.glob(os.path.join(SHARD_DIR, 'apps_catalog.shard-*.json')))
+    review_files = sorted(glob.glob(os.path.join(SHARD_DIR, 'apps_reviews.shard-*.jsonl')))
+    if not catalog_files:
+        raise FileNotFoundError(f"No shard files found in {SHARD_DIR}")
+    if run_id is None:
+        run_id, _ = load_work_list()
+    shards = {path: read_shard(path) for path in catalog_files + review_files}
+    stale = [os.path.basename(path) for path, (shard_run, _) in shards.items() if shard_run != run_id]
+    if stale:
+        raise ValueError(f"Shard files not from run {run_id} (re-run or delete them): {', '.join(stale)}")
+    
+    # Refuse to merge an incomplete run
+    shard_counts = {int(SHARD_RE.search(path).group(2)) for path in catalog_files + review_files}
+    if len(shard_counts) != 1:
+        raise ValueError(f"Shard files from different runs found: shard counts {sorted(shard_counts)}")
+    num_shards = shard_counts.pop()
+    for files in (catalog_files, review_files):
+        present = {int(SHARD_RE.search(path).group(1)) for path in files}
+        missing = sorted(set(range(num_shards)) - present)
+        if missing:
+            raise ValueError(f"Missing shards {missing} of {num_shards}")
+    
+    # Catalog: one record per app, first locale in (appId, country, lang) order wins
+    apps_metadata = []
+    for path in catalog_files:
+        apps_metadata.extend(shards[path][1])
+    apps_metadata.sort(key=lambda a: (a['appId'], a.get('country', ''), a.get('lang', '')))
+    seen_apps = set()
+    merged_apps = []
+    for metadata in apps_metadata:
+        if metadata['appId'] not in seen_apps:
+            seen_apps.add(metadata['appId'])
+            merged_apps.append(metadata)
+    
+    # Reviews: one record per reviewId, in a stable order
+    all_reviews = []
+    for path in review_files:
+        all_reviews.extend(shards[path][1])
+    all_reviews.sort(key=lambda r: (r['app_id'], str(r.get('reviewId')), r.get('country', ''), r.get('lang', '')))
+    seen_reviews = set()
+    merged_reviews = []
+    for review in all_reviews:
+        if review.get('reviewId') not in seen_reviews:
+            seen_reviews.add(review.get('reviewId'))
+            merged_reviews.append(review)
+    
+    with open('data/raw/apps_catalog.json', 'w', encoding='utf-8') as f:
+        json.dump(merged_apps, f, indent=2, ensure_ascii=False)
+    print(f"Saved {len(merged_apps)} apps to apps_catalog.json")
+    
+    with open('data/raw/apps_reviews.jsonl', 'w', encoding='utf-8') as f:
+        for review in merged_reviews:
+            f.write(json.dumps(review, ensure_ascii=False) + '\n')
+    print(f"Saved {len(merged_reviews)} reviews to apps_reviews.jsonl")
+    
+    return merged_apps, merged_reviews
+
+def parse_locales(value):
+    """'us:en,gb:en' → [('us', 'en'), ('gb', 'en')]"""
+    locales = []
+    for part in value.split(','):
+        country, lang = part.strip().split(':')
+        locales.append((country.lower(), lang.lower()))
+    return locales
+
+def main(num_workers=1, locales=None, rediscover=False):
+    # Step 1: Get list of AI note-taking apps
+    app_ids = get_ai_note_apps(rediscover)
+    print(f"Processing {len(app_ids)} apps")
+    
+    # Step 2: Build and persist the (app, country, lang) work list
+    work_list = build_work_list(app_ids, locales)
+    run_id = save_work_list(work_list)
+    
+    # Step 3: Scrape metadata + reviews, one shard per worker
+    run_shards(work_list, run_id, num_workers)
+    
+    # Step 4: Merge shards into the canonical raw files
+    apps_metadata, all_reviews = merge_shards(run_id)
     
     print(f"\nIngestion complete!")
     print(f"Apps: {len(apps_metadata)}")
     print(f"Reviews: {len(all_reviews)}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape Google Play apps and reviews")
+    parser.add_argument("--workers", type=int, default=1, help="Local worker processes / shards (default 1)")
+    parser.add_argument("--locales", default="us:en", help="Comma-separated country:lang pairs (default us:en)")
+    parser.add_argument("--discover-only", action="store_true", help="Only discover apps and write the work list")
+    parser.add_argument("--shard", help="Run a single shard 'i/N' from the saved work list")
+    parser.add_argument("--merge", action="store_true", help="Only merge existing shard files")
+    parser.add_argument("--rediscover", action="store_true", help="Ignore the saved discovery state")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    locales = parse_locales(args.locales)
+    
+    if args.discover_only:
+        save_work_list(build_work_list(get_ai_note_apps(args.rediscover), locales))
+    elif args.shard:
+        shard_index, num_shards = (int(x) for x in args.shard.split('/'))
+        run_id, work_list = load_work_list()
+        ingest_shard(work_list, run_id, shard_index, num_shards)
+    elif args.merge:
+        merge_shards()
+    else:
+        main(num_workers=args.workers, locales=locales, rediscover=args.rediscover)
@@ -2,11 +2,20 @@
 Data Transformation
 Converts raw JSON/JSONL data into clean, structured CSV files
 """
+import os
+import sys
 import json
 import pandas as pd
 from datetime import datetime
 import re
 
+# Run directly (python src/<stage>.py) the repo root is not on sys.path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.data_access import save_processed
+
 def load_raw_data():
     """Load raw JSON and JSONL files"""
     print("Loading raw data...")
@@ -154,12 +163,12 @@ def main():
     
     # Transform apps
     apps_clean = transform_apps(apps_data)
-    apps_clean.to_csv('data/processed/apps_catalog.csv', index=False)
+    save_processed(apps_clean, 'apps_catalog')
     print(f"Saved clean apps catalog: {len(apps_clean)} rows")
     
     # Transform reviews
     reviews_clean = transform_reviews(reviews_data, apps_clean)
-    reviews_clean.to_csv('data/processed/apps_reviews.csv', index=False)
+    save_processed(reviews_clean, 'apps_reviews')
     print(f"Saved clean reviews: {len(reviews_clean)} rows")
     
     print("\nTransformation complete!")
@@ -2,15 +2,37 @@
 Serving Layer
 Creates analytics-ready aggregated datasets
 """
+import os
+import sys
 import pandas as pd
 
-def create_app_level_kpis():
+# Run directly (python src/<stage>.py) the repo root is not on sys.path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.data_access import load_processed, save_processed
+
+def load_reviews(exclude_duplicates=False):
+    """Load clean reviews, optionally dropping near-duplicates flagged by 06_detect_near_duplicates"""
+    reviews = load_processed('apps_reviews')
+    reviews['at'] = pd.to_datetime(reviews['at'])
+    
+    duplicates_path = 'data/processed/review_duplicates.csv'
+    if exclude_duplicates and os.path.exists(duplicates_path):
+        duplicates = load_processed('review_duplicates')
+        flagged = set(duplicates.loc[duplicates['is_duplicate'], 'reviewId'])
+        reviews = reviews[~reviews['reviewId'].astype(str).isin(flagged)]
+        print(f"Excluded {len(flagged)} near-duplicate reviews")
+    
+    return reviews
+
+def create_app_level_kpis(exclude_duplicates=False):
     """Create app-level aggregated metrics"""
     print("Creating app-level KPIs...")
     
     # Load clean data
-    reviews = pd.read_csv('data/processed/apps_reviews.csv')
-    reviews['at'] = pd.to_datetime(reviews['at'])
+    reviews = load_reviews(exclude_duplicates)
     
     # Calculate metrics per app
     app_kpis = reviews.groupby('app_id').agg({
@@ -29,7 +51,7 @@ def create_app_level_kpis():
     app_kpis['pct_low_ratings'] = (app_kpis['low_rating_count'] / app_kpis['num_reviews'] * 100).round(2)
     
     # Add app names
-    apps = pd.read_csv('data/processed/apps_catalog.csv')
+    apps = load_processed('apps_catalog', columns=['appId', 'title'])
     app_kpis = app_kpis.merge(apps[['appId', 'title']], left_on='app_id', right_on='appId', how='left')
     
     # Select final columns
@@ -41,18 +63,23 @@ def create_app_level_kpis():
     # Round average rating
     app_kpis['avg_rating'] = app_kpis['avg_rating'].round(2)
     
-    app_kpis.to_csv('data/processed/app_level_kpis.csv', index=False)
+    # Join text features (sentiment, keywords) when the text stage has run
+    text_features_path = 'data/processed/app_text_features.csv'
+    if os.path.exists(text_features_path):
+        app_text = load_processed('app_text_features')
+        app_kpis = app_kpis.merge(app_text, on='app_id', how='left')
+    
+    save_processed(app_kpis, 'app_level_kpis')
     print(f"Saved app-level KPIs: {len(app_kpis)} apps")
     
     return app_kpis
 
-def create_daily_metrics():
+def create_daily_metrics(exclude_duplicates=False):
     """Create daily time series metrics"""
     print("Creating daily metrics...")
     
     # Load clean data
-    reviews = pd.read_csv('data/processed/apps_reviews.csv')
-    reviews['at'] = pd.to_datetime(reviews['at'])
+    reviews = load_reviews(exclude_duplicates)
     reviews['date'] = reviews['at'].dt.date
     
     # Calculate daily metrics
@@ -67,15 +94,15 @@ def create_daily_metrics():
     # Sort by date
     daily_metrics = daily_metrics.sort_values('date')
     
-    daily_metrics.to_csv('data/processed/daily_metrics.csv', index=False)
+    save_processed(daily_metrics, 'daily_metrics')
     print(f"Saved daily metrics: {len(daily_metrics)} days")
     
     return daily_metrics
 
-def main():
+def main(exclude_duplicates=False):
     # Create serving layer outputs
-    app_kpis = create_app_level_kpis()
-    daily_metrics = create_daily_metrics()
+    app_kpis = create_app_level_kpis(exclude_duplicates)
+    daily_metrics = create_daily_metrics(exclude_duplicates)
     
     print("\nServing layer complete!")
     print(f"App-level KPIs: data/processed/app_level_kpis.csv")
@@ -2,27 +2,38 @@
 Dashboard - Consumer View
 Creates visually stunning market intelligence dashboard
 """
+import os
+import sys
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from scipy import stats
 import numpy as np
 
+# Run directly (python src/<stage>.py) the repo root is not on sys.path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.data_access import load_processed
+
 def load_data():
     """Load processed data"""
-    app_kpis = pd.read_csv('data/processed/app_level_kpis.csv')
-    daily_metrics = pd.read_csv('data/processed/daily_metrics.csv')
+    app_kpis = load_processed('app_level_kpis')
+    daily_metrics = load_processed('daily_metrics')
     daily_metrics['date'] = pd.to_datetime(daily_metrics['date'])
     
     return app_kpis, daily_metrics
 
 def create_dashboard():
     """Create a visually stunning dashboard"""
+    # Plotly and SciPy are slow to import; only pay for them when drawing
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    from scipy import stats
+    
     print("Creating dashboard...")
     
     # Load data
     app_kpis, daily_metrics = load_data()
-    reviews = pd.read_csv('data/processed/apps_reviews.csv')
+    reviews = load_processed('apps_reviews', columns=['score', 'at'])
     reviews['at'] = pd.to_datetime(reviews['at'])
     
     # Define modern color palette
@@ -0,0 +1,290 @@
+"""
+Text Feature Extraction
+Extracts keyword (hashed bag-of-words / TF-IDF) and lexicon sentiment features
+from review content, in parallel chunks, with a per-review cache
+"""
+import json
+import os
+import re
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Run directly (python src/<stage>.py) the repo root is not on sys.path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.data_access import load_processed, save_processed
+
+CACHE_DIR = 'data/processed/text_features'
+N_FEATURES = 2 ** 18     # Hashed vocabulary size
+CHUNK_SIZE = 5000        # Reviews per worker task
+TOP_KEYWORDS = 10        # Keywords kept per app
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if', 'in',
+    'into', 'is', 'it', 'its', 'of', 'on', 'or', 'so', 'that', 'the', 'their',
+    'then', 'there', 'these', 'they', 'this', 'to', 'was', 'were', 'will',
+    'with', 'i', 'me', 'my', 'you', 'your', 'we', 'our', 'have', 'has', 'had',
+    'app', 'just', 'can', 'do', 'does', 'from', 'all', 'very', 'would', 'get',
+}
+
+POSITIVE_WORDS = {
+    'good', 'great', 'excellent', 'amazing', 'awesome', 'love', 'loved', 'loving',
+    'best', 'perfect', 'nice', 'helpful', 'useful', 'easy', 'fast', 'smooth',
+    'simple', 'fantastic', 'wonderful', 'reliable', 'accurate', 'intuitive',
+    'recommend', 'recommended', 'like', 'works', 'worth', 'brilliant', 'happy',
+    'convenient', 'efficient', 'clean', 'beautiful', 'powerful', 'handy',
+}
+
+NEGATIVE_WORDS = {
+    'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'hated', 'poor',
+    'useless', 'slow', 'crash', 'crashes', 'crashing', 'crashed', 'bug', 'bugs',
+    'buggy', 'broken', 'error', 'errors', 'fail', 'fails', 'failed', 'freeze',
+    'freezes', 'lag', 'laggy', 'annoying', 'expensive', 'scam', 'waste', 'lost',
+    'disappointed', 'disappointing', 'confusing', 'ads', 'refund', 'glitch',
+}
+
+# "don't" tokenizes to ['don', 't'], so the bare 't' marks every n't contraction
+NEGATIONS = {'not', 'no', 'never', 'cannot', 'dont', 'cant', 'isnt', 'doesnt', 'didnt', 'wont', 't'}
+NEGATION_WINDOW = 3      # A negation flips sentiment words up to 3 tokens later
+
+
+def tokenize(text):
+    """Lowercase and split text into word tokens"""
+    if not isinstance(text, str):
+        return []
+    return TOKEN_RE.findall(text.lower())
+
+
+def hash_token(token):
+    """Stable token → feature index (crc32 is identical across processes, unlike hash())"""
+    return zlib.crc32(token.encode('utf-8')) % N_FEATURES
+
+
+def score_sentiment(tokens):
+    """Lexicon sentiment with simple negation handling; returns (pos_hits, neg_hits, score)"""
+    pos_hits = 0
+    neg_hits = 0
+    last_negation = -NEGATION_WINDOW - 1
+    for i, token in enumerate(tokens):
+        if token in NEGATIONS:
+            last_negation = i
+            continue
+        negated = i - last_negation <= NEGATION_WINDOW
+        if token in POSITIVE_WORDS:
+            if negated:
+                neg_hits += 1
+            else:
+                pos_hits += 1
+        elif token in NEGATIVE_WORDS:
+            if negated:
+                pos_hits += 1
+            else:
+                neg_hits += 1
+
+    total = pos_hits + neg_hits
+    score = (pos_hits - neg_hits) / total if total else 0.0
+    return pos_hits, neg_hits, score
+
+
+def process_chunk(chunk):
+    """
+    Extract features for one chunk of (reviewId, content) pairs.
+    Runs in a worker process; returns plain arrays + a CSR count matrix.
+    """
+    review_ids, contents = chunk
+    indptr = [0]
+    indices = []
+    data = []
+    token_counts = []
+    pos_hits = []
+    neg_hits = []
+    scores = []
+    vocab = {}
+
+    for content in contents:
+        tokens = tokenize(content)
+        pos, neg, score = score_sentiment(tokens)
+        pos_hits.append(pos)
+        neg_hits.append(neg)
+        scores.append(score)
+        token_counts.append(len(tokens))
+
+        counts = {}
+        for token in tokens:
+            if len(token) < 3 or token in STOPWORDS or token in NEGATIONS:
+                continue
+            idx = hash_token(token)
+            counts[idx] = counts.get(idx, 0) + 1
+            vocab.setdefault(idx, token)
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(contents), N_FEATURES)
+    )
+    features = pd.DataFrame({
+        'reviewId': review_ids,
+        'token_count': token_counts,
+        'pos_hits': pos_hits,
+        'neg_hits': neg_hits,
+        'sentiment_score': np.round(scores, 4)
+    })
+    return features, matrix, vocab
+
+
+def load_cache():
+    """Load cached per-review features, count matrix and vocabulary (if any)"""
+    features_path = os.path.join(CACHE_DIR, 'review_features.csv')
+    counts_path = os.path.join(CACHE_DIR, 'term_counts.npz')
+    vocab_path = os.path.join(CACHE_DIR, 'vocab.json')
+    if not (os.path.exists(features_path) and os.path.exists(counts_path)):
+        return None, None, {}
+
+    features = pd.read_csv(features_path, dtype={'reviewId': str})
+    counts = sparse.load_npz(counts_path).tocsr()
+    vocab = {}
+    if os.path.exists(vocab_path):
+        with open(vocab_path, 'r', encoding='utf-8') as f:
+            vocab = {int(k): v for k, v in json.load(f).items()}
+    return features, counts, vocab
+
+
+def save_cache(features, counts, vocab):
+    """Persist per-review features (row-aligned with the count matrix) and vocabulary"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    features.to_csv(os.path.join(CACHE_DIR, 'review_features.csv'), index=False)
+    sparse.save_npz(os.path.join(CACHE_DIR, 'term_counts.npz'), counts)
+    with open(os.path.join(CACHE_DIR, 'vocab.json'), 'w', encoding='utf-8') as f:
+        json.dump({str(k): v for k, v in vocab.items()}, f, ensure_ascii=False)
+
+
+def extract_features(reviews, max_workers=None):
+    """
+    Return (features, counts, vocab) for every review in `reviews`.
+    Only reviews missing from the cache are processed; chunks run across a process pool.
+    """
+    cached_features, cached_counts, vocab = load_cache()
+    cached_ids = set(cached_features['reviewId']) if cached_features is not None else set()
+
+    new_reviews = reviews[~reviews['reviewId'].isin(cached_ids)].drop_duplicates(subset=['reviewId'])
+    print(f"Reviews cached: {len(cached_ids)} | new to process: {len(new_reviews)}")
+
+    if len(new_reviews):
+        ids = new_reviews['reviewId'].tolist()
+        contents = new_reviews['content'].fillna('').tolist()
+        chunks = [
+            (ids[i:i + CHUNK_SIZE], contents[i:i + CHUNK_SIZE])
+            for i in range(0, len(ids), CHUNK_SIZE)
+        ]
+
+        # Small runs aren't worth the process start-up cost
+        if len(chunks) == 1:
+            results = [process_chunk(chunks[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(process_chunk, chunks))
+
+        new_features = pd.concat([r[0] for r in results], ignore_index=True)
+        new_counts = sparse.vstack([r[1] for r in results], format='csr')
+        for _, _, chunk_vocab in results:
+            for idx, token in chunk_vocab.items():
+                vocab.setdefault(idx, token)
+
+        if cached_features is not None:
+            cached_features = pd.concat([cached_features, new_features], ignore_index=True)
+            cached_counts = sparse.vstack([cached_counts, new_counts], format='csr')
+        else:
+            cached_features, cached_counts = new_features, new_counts
+        save_cache(cached_features, cached_counts, vocab)
+
+    # Keep only the rows of reviews currently in the processed data, in their order
+    positions = pd.Series(np.arange(len(cached_features)), index=cached_features['reviewId'])
+    positions = positions[~positions.index.duplicated(keep='first')]
+    rows = positions.reindex(reviews['reviewId']).dropna().astype(int).to_numpy()
+    return cached_features.iloc[rows].reset_index(drop=True), cached_counts[rows], vocab
+
+
+def compute_tfidf(counts):
+    """Smoothed IDF weighting + L2 row normalisation, kept sparse"""
+    n_docs = counts.shape[0]
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log((1 + n_docs) / (1 + doc_freq)) + 1
+    tfidf = counts.multiply(idf.astype(np.float32)).tocsr()
+
+    norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ tfidf
+
+
+def top_keywords_per_app(tfidf, app_ids, vocab, k=TOP_KEYWORDS):
+    """Sum TF-IDF per app (sparse app × review indicator product) and keep the top-k terms"""
+    codes, apps = pd.factorize(app_ids)
+    indicator = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.float32), (codes, np.arange(len(codes)))),
+        shape=(len(apps), len(codes))
+    )
+    app_terms = (indicator @ tfidf).tocsr()
+
+    keywords = {}
+    for i, app_id in enumerate(apps):
+        row = app_terms.getrow(i)
+        if row.nnz == 0:
+            keywords[app_id] = ''
+            continue
+        top = np.argsort(row.data)[::-1][:k]
+        keywords[app_id] = ';'.join(vocab.get(int(idx), str(idx)) for idx in row.indices[top])
+    return keywords
+
+
+def main():
+    # Load clean data
+    reviews = load_processed('apps_reviews', columns=['reviewId', 'app_id', 'content'])
+    print("Extracting text features...")
+
+    features, counts, vocab = extract_features(reviews)
+
+    # Per-review output
+    features = features.merge(reviews[['reviewId', 'app_id']], on='reviewId', how='left')
+    features['sentiment_label'] = np.select(
+        [features['sentiment_score'] > 0.05, features['sentiment_score'] < -0.05],
+        ['positive', 'negative'],
+        default='neutral'
+    )
+    features = features[[
+        'reviewId', 'app_id', 'token_count', 'pos_hits', 'neg_hits',
+        'sentiment_score', 'sentiment_label'
+    ]]
+    save_processed(features, 'review_text_features')
+    print(f"Saved review text features: {len(features)} reviews")
+
+    # Per-app output
+    tfidf = compute_tfidf(counts)
+    keywords = top_keywords_per_app(tfidf, features['app_id'].to_numpy(), vocab)
+    app_features = features.groupby('app_id').agg(
+        avg_sentiment=('sentiment_score', 'mean'),
+        pct_negative_text=('sentiment_label', lambda s: (s == 'negative').mean() * 100)
+    ).reset_index()
+    app_features['avg_sentiment'] = app_features['avg_sentiment'].round(3)
+    app_features['pct_negative_text'] = app_features['pct_negative_text'].round(2)
+    app_features['top_keywords'] = app_features['app_id'].map(keywords)
+    save_processed(app_features, 'app_text_features')
+    print(f"Saved app text features: {len(app_features)} apps")
+
+    print("\nText feature extraction complete!")
+    print(f"Review features: data/processed/review_text_features.csv")
+    print(f"App features: data/processed/app_text_features.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Near-Duplicate Review Detection
+Flags copy-pasted / templated reviews with MinHash signatures and LSH banding
+"""
+import os
+import re
+import sys
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Run directly (python src/<stage>.py) the repo root is not on sys.path
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from src.data_access import load_processed, save_processed
+
+STATE_DIR = 'data/processed/near_duplicates'
+OUTPUT_PATH = 'data/processed/review_duplicates.csv'
+
+NUM_PERM = 128           # MinHash signature length
+NUM_BANDS = 16           # LSH bands (NUM_PERM / NUM_BANDS = 8 rows per band)
+SHINGLE_SIZE = 3         # Word shingles
+MIN_TOKENS = 8           # Shorter reviews ("great app") are legitimately identical — skip them
+SIMILARITY_THRESHOLD = 0.8
+CHUNK_SIZE = 500         # Reviews per vectorized MinHash block (bounds memory)
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Fixed seed: signatures from different runs must be comparable
+_rng = np.random.RandomState(42)
+PERM_A = _rng.randint(1, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+PERM_B = _rng.randint(0, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+
+def shingle_hashes(text):
+    """32-bit hashes of the word shingles of a review (empty if too short)"""
+    tokens = TOKEN_RE.findall(str(text).lower())
+    if len(tokens) < MIN_TOKENS:
+        return None
+    shingles = {' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signatures(hash_sets):
+    """
+    MinHash signatures for a list of shingle-hash arrays, one (n_docs, NUM_PERM) uint32 matrix.
+    All shingles of a chunk are permuted at once and reduced per document with minimum.reduceat.
+    """
+    signatures = np.empty((len(hash_sets), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(hash_sets), CHUNK_SIZE):
+        chunk = hash_sets[start:start + CHUNK_SIZE]
+        lengths = np.array([len(h) for h in chunk])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        flat = np.concatenate(chunk)
+
+        # (a * h + b) mod p, truncated to 32 bits — uint64 overflow wraps, as in datasketch
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(PERM_A, flat) + PERM_B[:, None]) % MERSENNE_PRIME & MAX_HASH
+        signatures[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+def band_hashes(signatures):
+    """Collapse each band of rows into one uint64 bucket key → (n_docs, NUM_BANDS)"""
+    rows = NUM_PERM // NUM_BANDS
+    bands = signatures.astype(np.uint64).reshape(len(signatures), NUM_BANDS, rows)
+    keys = np.zeros((len(signatures), NUM_BANDS), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for r in range(rows):
+            keys = keys * np.uint64(1000003) ^ bands[:, :, r]
+    return keys
+
+
+def load_state():
+    """Load persisted review ids, signatures, band keys and too-short ids from earlier runs"""
+    ids_path = os.path.join(STATE_DIR, 'review_ids.csv')
+    skipped_path = os.path.join(STATE_DIR, 'skipped_ids.csv')
+    skipped = set()
+    if os.path.exists(skipped_path):
+        skipped = set(pd.read_csv(skipped_path, dtype={'reviewId': str})['reviewId'])
+    if not os.path.exists(ids_path):
+        empty = pd.Series([], dtype=str)
+        return empty, np.empty((0, NUM_PERM), dtype=np.uint32), np.empty((0, NUM_BANDS), dtype=np.uint64), skipped
+    review_ids = pd.read_csv(ids_path, dtype={'reviewId': str})['reviewId']
+    signatures = np.load(os.path.join(STATE_DIR, 'signatures.npy'))
+    bands = np.load(os.path.join(STATE_DIR, 'bands.npy'))
+    return review_ids, signatures, bands, skipped
+
+
+def save_state(review_ids, signatures, bands, skipped):
+    """Persist review ids, signatures and band keys (row-aligned) plus too-short ids"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    pd.DataFrame({'reviewId': review_ids}).to_csv(os.path.join(STATE_DIR, 'review_ids.csv'), index=False)
+    np.save(os.path.join(STATE_DIR, 'signatures.npy'), signatures)
+    np.save(os.path.join(STATE_DIR, 'bands.npy'), bands)
+    pd.DataFrame({'reviewId': sorted(skipped)}).to_csv(os.path.join(STATE_DIR, 'skipped_ids.csv'), index=False)
+
+
+def candidate_pairs(bands, new_start):
+    """
+    Pairs (i, j) sharing at least one LSH bucket where j is a new row (j >= new_start).
+    Rows with identical band keys (copies of one signature) are collapsed onto their lowest
+    row first: a copy is paired only with that row, and the per-band hash join runs over
+    distinct signatures. A spam template copied k times costs O(k), not O(k²), while every
+    distinct bucket member is still a candidate, so the clusters match the full join.
+    """
+    rows = np.arange(len(bands))
+    if not len(rows):
+        return np.empty((0, 2), dtype=np.int64)
+    band_keys = pd.DataFrame(bands)
+    canonical = band_keys.assign(row=rows).groupby(list(band_keys.columns))['row'].transform('min').to_numpy()
+    copies = (rows >= new_start) & (canonical < rows)
+    pairs = [np.column_stack([canonical[copies], rows[copies]])]
+
+    distinct = rows[canonical == rows]
+    for b in range(bands.shape[1]):
+        keys = pd.DataFrame({'key': bands[distinct, b], 'row': distinct})
+        new_keys = keys[keys['row'] >= new_start]
+        matches = new_keys.merge(keys, on='key', suffixes=('_new', '_any'))
+        matches = matches[matches['row_any'] < matches['row_new']]
+        pairs.append(matches[['row_any', 'row_new']].to_numpy())
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def find(parent, i):
+    """Union-find root with path halving"""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def union(parent, i, j):
+    """Merge two clusters; the lower row index stays root so cluster ids are stable"""
+    root_i, root_j = find(parent, i), find(parent, j)
+    if root_i != root_j:
+        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def cluster_reviews(review_ids, signatures, bands, new_start, previous):
+    """
+    Union new near-duplicate edges into the clusters found by earlier runs.
+    Returns a DataFrame (reviewId, cluster_id) for every review in a cluster of 2+.
+    """
+    parent = np.arange(len(review_ids))
+    position = pd.Series(np.arange(len(review_ids)), index=review_ids.to_numpy())
+
+    # Re-link previous clusters to their first member
+    if len(previous):
+        for _, members in previous.groupby('cluster_id')['reviewId']:
+            rows = position.reindex(members).dropna().astype(int).to_numpy()
+            for row in rows[1:]:
+                union(parent, rows[0], row)
+
+    # Verify candidates on the full signature (estimated Jaccard) to drop LSH false positives
+    pairs = candidate_pairs(bands, new_start)
+    if len(pairs):
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        for i, j in pairs[similarity >= SIMILARITY_THRESHOLD]:
+            union(parent, i, j)
+
+    # Pointer jumping: flatten every chain to its root in a few vectorized passes
+    roots = parent
+    while True:
+        next_roots = roots[roots]
+        if np.array_equal(next_roots, roots):
+            break
+        roots = next_roots
+    sizes = np.bincount(roots, minlength=len(roots))
+    in_cluster = sizes[roots] > 1
+    return pd.DataFrame({
+        'reviewId': review_ids.to_numpy()[in_cluster],
+        # Cluster id = the earliest-indexed member, stable across incremental runs
+        'cluster_id': review_ids.to_numpy()[roots[in_cluster]],
+        'cluster_size': sizes[roots[in_cluster]]
+    })
+
+
+def detect_near_duplicates(reviews):
+    """Index new reviews and return the updated near-duplicate cluster table"""
+    review_ids, signatures, bands, skipped = load_state()
+    seen = set(review_ids) | skipped
+    new_reviews = reviews[~reviews['reviewId'].isin(seen)].drop_duplicates(subset=['reviewId'])
+    print(f"Signatures cached: {len(review_ids)} | new reviews: {len(new_reviews)}")
+
+    hash_sets = []
+    new_ids = []
+    for review_id, content in zip(new_reviews['reviewId'], new_reviews['content']):
+        hashes = shingle_hashes(content)
+        if hashes is None:
+            skipped.add(review_id)
+        else:
+            hash_sets.append(hashes)
+            new_ids.append(review_id)
+    print(f"New reviews long enough to compare: {len(new_ids)}")
+
+    previous = pd.DataFrame(columns=['reviewId', 'cluster_id'])
+    if os.path.exists(OUTPUT_PATH):
+        previous = load_processed('review_duplicates')
+
+    new_start = len(review_ids)
+    if len(new_reviews):
+        if new_ids:
+            new_signatures = minhash_signatures(hash_sets)
+            review_ids = pd.concat([review_ids, pd.Series(new_ids, dtype=str)], ignore_index=True)
+            signatures = np.vstack([signatures, new_signatures])
+            bands = np.vstack([bands, band_hashes(new_signatures)])
+        save_state(review_ids, signatures, bands, skipped)
+
+    clusters = cluster_reviews(review_ids, signatures, bands, new_start, previous)
+
+    # Keep the earliest review of each cluster; every other member is a duplicate
+    first_at = reviews.drop_duplicates(subset=['reviewId']).set_index('reviewId')['at']
+    clusters['at'] = clusters['reviewId'].map(first_at)
+    clusters = clusters.sort_values(['cluster_id', 'at', 'reviewId'])
+    clusters['is_duplicate'] = clusters.duplicated(subset=['cluster_id'], keep='first')
+    return clusters[['reviewId', 'cluster_id', 'cluster_size', 'is_duplicate']]
+
+
+def main():
+    # Load clean data
+    reviews = load_processed('apps_reviews', columns=['reviewId', 'content', 'at'])
+    print("Detecting near-duplicate reviews...")
+
+    clusters = detect_near_duplicates(reviews)
+    save_processed(clusters, 'review_duplicates')
+
+    print(f"Near-duplicate clusters: {clusters['cluster_id'].nunique()}")
+    print(f"Reviews flagged as duplicates: {int(clusters['is_duplicate'].sum())}")
+    print(f"\nSaved: {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Data Access
+Arrow-based data exchange between DuckDB, pandas and the pipeline stages
+"""
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+
+PROCESSED_DIR = 'data/processed'
+BATCH_ROWS = 64 * 1024   # Rows per Arrow record batch (DuckDB result streams and IPC files)
+
+
+# ── DuckDB ↔ Arrow ───────────────────────────────────────────────────────────
+
+def result_batches(result, batch_size=BATCH_ROWS):
+    """Stream an executed query (the cursor con.execute returns) as Arrow record batches"""
+    yield from result.fetch_record_batch(batch_size)
+
+
+def iter_record_batches(con, sql, params=None, batch_size=BATCH_ROWS):
+    """Run a query and stream it as record batches of `batch_size` rows (bounded memory for large scans)"""
+    yield from result_batches(con.execute(sql, params or []), batch_size)
+
+
+def fetch_arrow(con, sql, params=None):
+    """Run a query and collect its record batch stream into a pyarrow Table (no Python row tuples)"""
+    return con.execute(sql, params or []).fetch_record_batch(BATCH_ROWS).read_all()
+
+
+def fetch_df(con, sql, params=None):
+    """Run a query and return an Arrow-backed pandas DataFrame"""
+    return to_pandas(fetch_arrow(con, sql, params))
+
+
+# ── Arrow ↔ pandas ───────────────────────────────────────────────────────────
+
+def to_pandas(table):
+    """Arrow Table → pandas DataFrame with ArrowDtype columns (no copy into NumPy objects)"""
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+# ── Stage hand-offs (Arrow IPC files) ────────────────────────────────────────
+
+def write_ipc(table, path):
+    """Write an Arrow Table as an uncompressed IPC file (memory-mappable), atomically"""
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=BATCH_ROWS)
+    os.replace(tmp_path, path)
+
+
+def read_ipc(path, columns=None):
+    """Memory-map an Arrow IPC file; column buffers are read lazily from the page cache"""
+    with pa.memory_map(path, 'r') as source:
+        table = ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def save_processed(df, name):
+    """
+    Save a stage output as data/processed/<name>.csv plus an Arrow IPC copy
+    (<name>.arrow) that downstream stages memory-map instead of re-parsing the CSV.
+    """
+    csv_path = os.path.join(PROCESSED_DIR, f'{name}.csv')
+    df.to_csv(csv_path, index=False)
+    write_ipc(pa.Table.from_pandas(df, preserve_index=False), os.path.join(PROCESSED_DIR, f'{name}.arrow'))
+    return csv_path
+
+
+def load_processed_table(name, columns=None):
+    """
+    Load a stage output as a pyarrow Table: the memory-mapped .arrow copy when it is
+    at least as new as the CSV, otherwise the CSV (e.g. edited by hand) via pyarrow.csv.
+    """
+    csv_path = os.path.join(PROCESSED_DIR, f'{name}.csv')
+    arrow_path = os.path.join(PROCESSED_DIR, f'{name}.arrow')
+    if os.path.exists(arrow_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(arrow_path) >= os.path.getmtime(csv_path)
+    ):
+        return read_ipc(arrow_path, columns)
+    return pa_csv.read_csv(csv_path, convert_options=pa_csv.ConvertOptions(include_columns=columns))
+
+
+def load_processed(name, columns=None):
+    """Load a stage output as an Arrow-backed DataFrame (see load_processed_table)"""
+    return to_pandas(load_processed_table(name, columns))
@@ -0,0 +1,78 @@
+"""
+Regression tests for src/06_detect_near_duplicates.py
+
+candidate_pairs collapses copies and joins distinct signatures only; the clusters it
+produces must match the all-members bucket join it replaces.
+"""
+import importlib
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+near_dup = importlib.import_module('src.06_detect_near_duplicates')
+candidate_pairs = near_dup.candidate_pairs
+
+
+def full_join_pairs(bands, new_start):
+    """Reference: every (i, j), i < j, sharing a bucket where j is new"""
+    pairs = []
+    for b in range(bands.shape[1]):
+        keys = pd.DataFrame({'key': bands[:, b], 'row': np.arange(len(bands))})
+        matches = keys[keys['row'] >= new_start].merge(keys, on='key', suffixes=('_new', '_any'))
+        matches = matches[matches['row_any'] < matches['row_new']]
+        pairs.append(matches[['row_any', 'row_new']].to_numpy())
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+def drift_chains(num_chains=200, chain_length=6, copies=3, seed=7):
+    """Chains of reviews where each step rewrites two words, plus exact copies of some steps"""
+    rng = np.random.RandomState(seed)
+    vocabulary = [f'w{i}' for i in range(5000)]
+    ids, texts = [], []
+    for c in range(num_chains):
+        words = list(rng.choice(vocabulary, size=30))
+        for step in range(chain_length):
+            ids.append(f'c{c}_t{step}')
+            texts.append(' '.join(words))
+            if c % 10 == 0 and step == 0:
+                for k in range(copies):
+                    ids.append(f'c{c}_copy{k}')
+                    texts.append(' '.join(words))
+            for pos in rng.choice(len(words), size=2, replace=False):
+                words[pos] = rng.choice(vocabulary)
+    order = rng.permutation(len(ids))
+    return pd.Series(np.array(ids)[order], dtype=str), [texts[i] for i in order]
+
+
+def partition(clusters):
+    return {frozenset(members) for members in clusters.groupby('cluster_id')['reviewId'].agg(set)}
+
+
+def run_clusters(monkeypatch, pair_fn, review_ids, signatures, bands, split):
+    """Cluster the first `split` rows, then the rest incrementally on top of those clusters"""
+    monkeypatch.setattr(near_dup, 'candidate_pairs', pair_fn)
+    first = near_dup.cluster_reviews(
+        review_ids[:split].reset_index(drop=True), signatures[:split], bands[:split], 0,
+        pd.DataFrame(columns=['reviewId', 'cluster_id'])
+    )
+    return near_dup.cluster_reviews(review_ids, signatures, bands, split, first)
+
+
+@pytest.mark.parametrize('split', [0, 500])
+def test_clusters_match_full_join(monkeypatch, split):
+    review_ids, texts = drift_chains()
+    signatures = near_dup.minhash_signatures([near_dup.shingle_hashes(t) for t in texts])
+    bands = near_dup.band_hashes(signatures)
+
+    expected = run_clusters(monkeypatch, full_join_pairs, review_ids, signatures, bands, split)
+    actual = run_clusters(monkeypatch, candidate_pairs, review_ids, signatures, bands, split)
+
+    assert (expected['cluster_size'] >= 3).any()
+    assert partition(actual) == partition(expected)